@@ -0,0 +1,38 @@
+"""Add jobs table partitioned by posting date
+
+Revision ID: 5f2a9c1e7b40
+Revises: 11cd04959dbd
+Create Date: 2026-10-19 09:12:31.402117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f2a9c1e7b40'
+down_revision = '11cd04959dbd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Daily partitions (jobs_YYYYMMDD) are created on demand by JobIngestionService
+    op.create_table('jobs',
+    sa.Column('site', sa.String(length=50), nullable=False),
+    sa.Column('external_id', sa.String(length=255), nullable=False),
+    sa.Column('date_posted', sa.Date(), nullable=False),
+    sa.Column('title', sa.String(length=512), nullable=True),
+    sa.Column('company', sa.String(length=255), nullable=True),
+    sa.Column('location', sa.String(length=255), nullable=True),
+    sa.Column('job_url', sa.Text(), nullable=True),
+    sa.Column('is_remote', sa.Boolean(), nullable=True),
+    sa.Column('scraped_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('site', 'external_id', 'date_posted'),
+    postgresql_partition_by='RANGE (date_posted)'
+    )
+
+
+def downgrade():
+    # Dropping the parent table drops all of its partitions
+    op.drop_table('jobs')
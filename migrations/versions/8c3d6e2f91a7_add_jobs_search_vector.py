@@ -0,0 +1,37 @@
+"""Add full-text search vector to jobs
+
+Revision ID: 8c3d6e2f91a7
+Revises: 5f2a9c1e7b40
+Create Date: 2026-10-19 11:40:05.218734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '8c3d6e2f91a7'
+down_revision = '5f2a9c1e7b40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Generated column and index propagate to every jobs_YYYYMMDD partition
+    op.add_column('jobs', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(company, '')), 'C')",
+            persisted=True
+        ),
+        nullable=True
+    ))
+    op.create_index('ix_jobs_search_vector', 'jobs', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_jobs_search_vector', table_name='jobs', postgresql_using='gin')
+    op.drop_column('jobs', 'search_vector')
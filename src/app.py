@@ -8,6 +8,8 @@ import sentry_sdk
 from flask import Flask
 from models import db, init_db
 from services.telegram import run_bot
+from services.job_ingestion import JobIngestionService
+from services.site_health import site_health
 from utils import log_version
 
 # Configure logging for Docker containers
@@ -48,7 +50,7 @@ def create_app():
 
     @app.route('/health')
     def health_check():
-        return {'status': 'healthy'}, 200
+        return {'status': 'healthy', 'sites': site_health.snapshot()}, 200
 
     return app, db, migrate
 
@@ -99,6 +101,19 @@ def watch_files():
             logger.error(f"File watcher error: {e}")
             time.sleep(5)  # Wait longer on error
 
+def run_cleanup():
+    """Periodically drop job partitions older than the retention window"""
+    interval_hours = float(os.getenv('JOBS_CLEANUP_INTERVAL_HOURS', '6'))
+    ingestion = JobIngestionService()
+    
+    while True:
+        try:
+            with app.app_context():
+                ingestion.drop_expired_partitions()
+        except Exception as e:
+            logger.error(f"Job cleanup error: {e}")
+        time.sleep(interval_hours * 3600)
+
 app, db, migrate = create_app()
 ctx = app.app_context()
 ctx.push()
@@ -120,6 +135,11 @@ if __name__ == '__main__':
     flask_thread.start()
     logger.info("Flask server started for health checks")
     
+    # Start retention cleanup for old job partitions
+    cleanup_thread = threading.Thread(target=run_cleanup, daemon=True)
+    cleanup_thread.start()
+    logger.info("Job cleanup started")
+    
     # Start file watcher in development mode
     if debug_mode:
         watcher_thread = threading.Thread(target=watch_files, daemon=True)
@@ -0,0 +1,287 @@
+"""
+Offline load test for the Telegram bot Dispatcher
+
+Simulates many users walking through /start -> /search -> term -> location
+by feeding updates straight into dp.feed_update. Telegram API calls go to a
+fake session and job scraping is replaced with a stub with configurable
+latency, so no network, database or bot token is needed.
+
+Usage:
+    uv run src/load_test.py --users 2000 --concurrency 200 --scrape-latency lognormal:0.5,0.8
+"""
+
+import os
+import sys
+import gc
+import time
+import types
+import random
+import asyncio
+import logging
+import argparse
+import statistics
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+# Telegram service refuses to import without a token; the fake session never uses it
+os.environ.setdefault('TELEGRAM_BOT_TOKEN', '123456:LOAD-TEST-TOKEN')
+
+from flask import Flask
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import SendMessage
+from aiogram.types import Chat, Message, Update
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TERMS = ['python developer', 'data scientist', 'frontend engineer', 'devops', 'product manager']
+LOCATIONS = ['remote', 'New York', 'London', 'San Francisco', 'Toronto, ON']
+STEPS = ['start', 'search', 'term', 'location']
+
+# Replies the handlers send after catching a failure
+ERROR_REPLIES = ('An error occurred', 'temporarily unavailable', '❌ Search failed')
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """
+    Parse a latency distribution spec into a sampler returning seconds
+
+    Supported: const:S, uniform:LO,HI, exp:MEAN, lognormal:MEDIAN,SIGMA
+    """
+    kind, _, params = spec.partition(':')
+    values = [float(value) for value in params.split(',') if value]
+    if kind == 'const':
+        return lambda: values[0]
+    if kind == 'uniform':
+        return lambda: random.uniform(values[0], values[1])
+    if kind == 'exp':
+        return lambda: random.expovariate(1 / values[0]) if values[0] > 0 else 0.0
+    if kind == 'lognormal':
+        median, sigma = values
+        return lambda: median * random.lognormvariate(0, sigma)
+    raise argparse.ArgumentTypeError(f"Unknown latency distribution: {spec}")
+
+class FakeSession(BaseSession):
+    """Bot API session that answers every method locally"""
+
+    def __init__(self, latency: Callable[[], float]):
+        super().__init__()
+        self.latency = latency
+        self.calls = 0
+        self.error_replies = 0
+        self._message_id = 0
+
+    async def make_request(self, bot, method, timeout=None):
+        self.calls += 1
+        delay = self.latency()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if not isinstance(method, SendMessage):
+            return True
+        if any(marker in method.text for marker in ERROR_REPLIES):
+            self.error_replies += 1
+        self._message_id += 1
+        return Message(
+            message_id=self._message_id,
+            date=datetime.now(timezone.utc),
+            chat=Chat(id=method.chat_id, type='private'),
+            text=method.text
+        )
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        return
+        yield
+
+    async def close(self):
+        pass
+
+def install_stubs(scrape_latency: Callable[[], float], jobs_per_search: int):
+    """Replace database and scraping dependencies of the bot handlers"""
+    # Handlers open app contexts via 'from app import app'; give them an app without a database
+    app_module = types.ModuleType('app')
+    app_module.app = Flask('load_test')
+    sys.modules['app'] = app_module
+
+    from models import User
+    from services import telegram
+    from services.job_scraping import JobScrapingService
+
+    async def search_jobs(self, search_term, location=None, site_name=None, only_new=False):
+        await asyncio.sleep(scrape_latency())
+        jobs = [
+            {
+                'id': f"stub-{i}",
+                'site': 'indeed',
+                'title': f"{search_term.title()} {i}",
+                'company': 'Stub Corp',
+                'location': location,
+                'job_url': f"https://example.com/jobs/{i}",
+                'date_posted': 'N/A',
+            }
+            for i in range(jobs_per_search)
+        ]
+        return {
+            'success': True,
+            'jobs': jobs,
+            'count': len(jobs),
+            'search_term': search_term,
+            'location': location
+        }
+
+    User.find_or_create = classmethod(lambda cls, telegram_user: None)
+    JobScrapingService.search_jobs = search_jobs
+    telegram.search_local_jobs = lambda search_term, location: {'success': False}
+    telegram.ingest_jobs = lambda jobs: []
+    return telegram
+
+class ErrorCounter(logging.Handler):
+    """Count errors that bot handlers log and swallow instead of raising"""
+
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.count = 0
+
+    def emit(self, record: logging.LogRecord):
+        self.count += 1
+
+class LoadTest:
+    """Drive synthetic users through the bot conversation"""
+
+    def __init__(self, dp, bot: Bot, users: int, concurrency: int, think_time: Callable[[], float]):
+        self.dp = dp
+        self.bot = bot
+        self.users = users
+        self.concurrency = concurrency
+        self.think_time = think_time
+        self.latencies: Dict[str, List[float]] = {step: [] for step in STEPS}
+        self.errors = 0  # Raised out of feed_update
+        self.logged_errors = ErrorCounter()
+        self.updates = 0
+        self.storage_samples: List[int] = []
+        self._update_id = 0
+
+    def make_update(self, user_id: int, text: str) -> Update:
+        """Build a private chat text message update"""
+        self._update_id += 1
+        return Update.model_validate({
+            'update_id': self._update_id,
+            'message': {
+                'message_id': self._update_id,
+                'date': int(time.time()),
+                'chat': {'id': user_id, 'type': 'private'},
+                'from': {'id': user_id, 'is_bot': False, 'first_name': f"user{user_id}"},
+                'text': text
+            }
+        }, context={'bot': self.bot})
+
+    async def run_user(self, user_id: int, semaphore: asyncio.Semaphore):
+        """Walk one user through the search conversation"""
+        texts = ['/start', '/search', random.choice(SEARCH_TERMS), random.choice(LOCATIONS)]
+        async with semaphore:
+            for step, text in zip(STEPS, texts):
+                started = time.perf_counter()
+                try:
+                    await self.dp.feed_update(self.bot, self.make_update(user_id, text))
+                except Exception as e:
+                    self.errors += 1
+                    logger.debug(f"Update failed for user {user_id}: {e}")
+                self.latencies[step].append(time.perf_counter() - started)
+                self.updates += 1
+                delay = self.think_time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+    async def sample_storage(self):
+        """Track the number of FSM storage records while the test runs"""
+        while True:
+            self.storage_samples.append(len(self.dp.storage.storage))
+            await asyncio.sleep(0.5)
+
+    async def run(self) -> Dict:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # Handlers catch Exception and reply normally, so count their error logs
+        services_logger = logging.getLogger('services')
+        services_logger.addHandler(self.logged_errors)
+        if services_logger.getEffectiveLevel() > logging.ERROR:
+            services_logger.setLevel(logging.ERROR)
+        sampler = asyncio.create_task(self.sample_storage())
+
+        gc.collect()
+        tracemalloc.start()
+        memory_before, _ = tracemalloc.get_traced_memory()
+        started = time.perf_counter()
+
+        await asyncio.gather(*(self.run_user(100000 + i, semaphore) for i in range(self.users)))
+
+        elapsed = time.perf_counter() - started
+        sampler.cancel()
+        services_logger.removeHandler(self.logged_errors)
+        gc.collect()
+        memory_after, memory_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            'elapsed': elapsed,
+            'memory_growth': memory_after - memory_before,
+            'memory_peak': memory_peak - memory_before,
+            'storage_records': len(self.dp.storage.storage),
+            'storage_peak': max(self.storage_samples, default=0),
+        }
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def print_report(test: LoadTest, result: Dict, session: FakeSession):
+    """Print latency, throughput, error and memory figures"""
+    all_latencies = [value for values in test.latencies.values() for value in values]
+    print(f"\nUsers: {test.users}  Concurrency: {test.concurrency}  Updates: {test.updates}")
+    print(f"Elapsed: {result['elapsed']:.2f}s  Throughput: {test.updates / result['elapsed']:.1f} updates/s")
+    errors = test.errors + session.error_replies
+    print(
+        f"Errors: {errors} ({errors / max(test.updates, 1):.2%}; {test.errors} raised, "
+        f"{session.error_replies} error replies)  Logged errors: {test.logged_errors.count}  "
+        f"Bot API calls: {session.calls}"
+    )
+    print(f"\n{'step':<10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for step, values in list(test.latencies.items()) + [('all', all_latencies)]:
+        mean = statistics.fmean(values) if values else 0.0
+        print(
+            f"{step:<10}{percentile(values, 50) * 1000:>10.1f}{percentile(values, 95) * 1000:>10.1f}"
+            f"{percentile(values, 99) * 1000:>10.1f}{mean * 1000:>10.1f}"
+        )
+    print(f"\nFSM storage records: {result['storage_records']} (peak {result['storage_peak']})")
+    print(
+        f"Memory growth: {result['memory_growth'] / 1024:.0f} KiB "
+        f"({result['memory_growth'] / max(test.users, 1):.0f} B/user), peak {result['memory_peak'] / 1024:.0f} KiB"
+    )
+
+async def main(args):
+    session = FakeSession(args.api_latency)
+    telegram = install_stubs(args.scrape_latency, args.jobs_per_search)
+    bot = Bot(token=os.environ['TELEGRAM_BOT_TOKEN'], session=session)
+
+    test = LoadTest(telegram.dp, bot, args.users, args.concurrency, args.think_time)
+    result = await test.run()
+    print_report(test, result, session)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Offline load test for the Telegram bot")
+    parser.add_argument('--users', type=int, default=1000, help="Number of synthetic users")
+    parser.add_argument('--concurrency', type=int, default=100, help="Users in a conversation at once")
+    parser.add_argument('--scrape-latency', type=parse_latency, default=parse_latency('lognormal:0.5,0.8'),
+                        help="Stub scraper latency distribution (const:S, uniform:LO,HI, exp:MEAN, lognormal:MEDIAN,SIGMA)")
+    parser.add_argument('--api-latency', type=parse_latency, default=parse_latency('const:0'),
+                        help="Fake Bot API latency distribution")
+    parser.add_argument('--think-time', type=parse_latency, default=parse_latency('const:0'),
+                        help="Pause between a user's messages")
+    parser.add_argument('--jobs-per-search', type=int, default=20, help="Jobs returned by the stub scraper")
+    parser.add_argument('--log-level', default='WARNING', help="Log level for bot handlers")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level, force=True)
+    asyncio.run(main(args))
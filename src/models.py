@@ -4,12 +4,13 @@ Database models for Jobs Watcher
 
 import os
 import logging
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from dataclasses import dataclass
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate, upgrade
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Integer, String, Text, Date, DateTime, Boolean, ForeignKey, Computed, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
 logger = logging.getLogger(__name__)
 
@@ -77,6 +78,8 @@ class User(db.Model):
             user.username = telegram_user.username
             user.first_name = telegram_user.first_name
             user.last_name = telegram_user.last_name
+            # Coming back after blocking the bot turns alerts and digests on again
+            user.is_active = True
             user.updated_at = datetime.now(timezone.utc)
             db.session.commit()
             
@@ -121,3 +124,72 @@ class Alert(db.Model):
     def get_user_alerts(cls, user_id):
         """Get all alerts for a user"""
         return cls.query.filter_by(user_id=user_id).all()
+
+@dataclass
+class Job(db.Model):
+    """Scraped job posting, range-partitioned by posting date"""
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        Index('ix_jobs_search_vector', 'search_vector', postgresql_using='gin'),
+        {'postgresql_partition_by': 'RANGE (date_posted)'},
+    )
+    
+    # Partition key must be part of the primary key on partitioned tables
+    site: Mapped[str] = mapped_column(String(50), primary_key=True)
+    external_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    date_posted: Mapped[date] = mapped_column(Date, primary_key=True)
+    title: Mapped[str | None] = mapped_column(String(512), nullable=True, default=None)
+    company: Mapped[str | None] = mapped_column(String(255), nullable=True, default=None)
+    location: Mapped[str | None] = mapped_column(String(255), nullable=True, default=None)
+    job_url: Mapped[str | None] = mapped_column(Text, nullable=True, default=None)
+    is_remote: Mapped[bool | None] = mapped_column(Boolean, nullable=True, default=None)
+    scraped_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
+    # Title weighted 'A', company 'C' for ranking in JobIndexService
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(company, '')), 'C')",
+            persisted=True
+        ),
+        nullable=True
+    )
+    
+    def __repr__(self):
+        return f'<Job {self.site}:{self.external_id}: {self.title}>'
+
+@dataclass
+class ScrapeWatermark(db.Model):
+    """Last successful scrape time per normalized query and site"""
+    __tablename__ = 'scrape_watermarks'
+    __table_args__ = (UniqueConstraint('query_key', 'site'),)
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    query_key: Mapped[str] = mapped_column(String(512), nullable=False)
+    site: Mapped[str] = mapped_column(String(50), nullable=False)
+    last_scraped_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f'<ScrapeWatermark {self.site}:{self.query_key} at {self.last_scraped_at}>'
+
+@dataclass
+class DigestEntry(db.Model):
+    """Alert match buffered for a user's next digest message"""
+    __tablename__ = 'digest_entries'
+    __table_args__ = (UniqueConstraint('user_id', 'site', 'external_id'),)
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
+    alert_id: Mapped[int | None] = mapped_column(Integer, nullable=True, default=None)
+    search_term: Mapped[str] = mapped_column(String(255), nullable=False)
+    site: Mapped[str] = mapped_column(String(50), nullable=False)
+    external_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    title: Mapped[str | None] = mapped_column(String(512), nullable=True, default=None)
+    company: Mapped[str | None] = mapped_column(String(255), nullable=True, default=None)
+    location: Mapped[str | None] = mapped_column(String(255), nullable=True, default=None)
+    job_url: Mapped[str | None] = mapped_column(Text, nullable=True, default=None)
+    date_posted: Mapped[date | None] = mapped_column(Date, nullable=True, default=None)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    def __repr__(self):
+        return f'<DigestEntry {self.user_id}: {self.site}:{self.external_id}>'
@@ -0,0 +1,194 @@
+"""
+Inverted-index matcher routing scraped jobs to matching alerts
+"""
+
+import re
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from models import Alert
+
+logger = logging.getLogger(__name__)
+
+# Keep '+' and '#' so 'c++' and 'c#' stay distinct tokens
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+")
+
+def tokenize(text: str | None) -> frozenset[str]:
+    """Lowercase word tokens of a search term, title or location"""
+    if not text:
+        return frozenset()
+    return frozenset(TOKEN_PATTERN.findall(text.lower()))
+
+def location_tokens(location: str | None) -> frozenset[str]:
+    """Tokens of the city part of a location, as used by JobIndexService"""
+    if not location:
+        return frozenset()
+    return tokenize(location.split(',')[0])
+
+@dataclass(frozen=True)
+class IndexedAlert:
+    """Alert fields needed for matching"""
+    id: int
+    user_id: int
+    search_term: str
+    terms: frozenset[str]
+    location: frozenset[str]
+
+class AlertMatcher:
+    """
+    In-memory inverted index over alert search terms
+
+    Each alert is posted under a single anchor token, the one with the
+    shortest posting list when the alert is added. A job only visits the
+    posting lists of its own title tokens and verifies the remaining terms
+    and location of those candidates, so matching cost follows the job's
+    token count rather than the total number of alerts.
+    """
+
+    def __init__(self):
+        self._alerts: Dict[int, IndexedAlert] = {}
+        self._anchors: Dict[int, str] = {}
+        self._postings: Dict[str, set[int]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def load(self, alerts: Iterable[Alert]):
+        """Rebuild the index from all stored alerts"""
+        with self._lock:
+            self._alerts.clear()
+            self._anchors.clear()
+            self._postings.clear()
+        for alert in alerts:
+            self.add(alert)
+        logger.info(f"Alert index loaded with {len(self._alerts)} alerts")
+
+    def add(self, alert: Alert):
+        """Index a new or updated alert"""
+        self.add_indexed(self.to_indexed(alert))
+
+    @staticmethod
+    def to_indexed(alert: Alert) -> IndexedAlert:
+        """Snapshot the alert fields needed for matching"""
+        return IndexedAlert(
+            id=alert.id,
+            user_id=alert.user_id,
+            search_term=alert.search_term,
+            terms=tokenize(alert.search_term),
+            location=location_tokens(alert.location)
+        )
+
+    def add_indexed(self, indexed: IndexedAlert):
+        """Index an alert snapshot, replacing any previous version"""
+        if not indexed.terms:
+            logger.warning(f"Alert {indexed.id} has no searchable terms, not indexed")
+            self.remove(indexed.id)
+            return
+        with self._lock:
+            self._remove(indexed.id)
+            anchor = min(indexed.terms, key=lambda token: (len(self._postings.get(token, ())), token))
+            self._alerts[indexed.id] = indexed
+            self._anchors[indexed.id] = anchor
+            self._postings[anchor].add(indexed.id)
+
+    def remove(self, alert_id: int):
+        """Drop an alert from the index"""
+        with self._lock:
+            self._remove(alert_id)
+
+    def match(self, job: Dict) -> List[IndexedAlert]:
+        """Find all alerts whose terms and location match a job"""
+        title = tokenize(job.get('title'))
+        if not title:
+            return []
+        job_location = tokenize(job.get('location'))
+        is_remote = bool(job.get('is_remote')) or 'remote' in job_location
+
+        matched = []
+        with self._lock:
+            for token in title:
+                for alert_id in self._postings.get(token, ()):
+                    alert = self._alerts[alert_id]
+                    if alert.terms <= title and self._location_matches(alert, job_location, is_remote):
+                        matched.append(alert)
+        return matched
+
+    def match_jobs(self, jobs: Iterable[Dict]) -> Dict[int, List[tuple[Dict, IndexedAlert]]]:
+        """
+        Route jobs to users in one pass
+
+        Returns:
+            Dict of user_id to (job, alert) pairs, one pair per job
+        """
+        routed: Dict[int, Dict[int, tuple[Dict, IndexedAlert]]] = defaultdict(dict)
+        for job in jobs:
+            for alert in self.match(job):
+                # A job matching several alerts of the same user is sent once
+                routed[alert.user_id].setdefault(id(job), (job, alert))
+        return {user_id: list(pairs.values()) for user_id, pairs in routed.items()}
+
+    @staticmethod
+    def _location_matches(alert: IndexedAlert, job_location: frozenset[str], is_remote: bool) -> bool:
+        """Alerts without a location match anywhere; 'remote' matches remote jobs"""
+        if not alert.location:
+            return True
+        if alert.location == {'remote'}:
+            return is_remote
+        return alert.location <= job_location
+
+    def _remove(self, alert_id: int):
+        """Drop an alert from the index (lock held)"""
+        anchor = self._anchors.pop(alert_id, None)
+        self._alerts.pop(alert_id, None)
+        if anchor is None:
+            return
+        postings = self._postings.get(anchor)
+        if postings is None:
+            return
+        postings.discard(alert_id)
+        if not postings:
+            del self._postings[anchor]
+
+# Shared index for the bot process
+alert_matcher = AlertMatcher()
+
+# Session.info key for index changes waiting for their transaction to commit
+PENDING_CHANGES = 'alert_matcher_pending'
+
+def _queue_change(alert: Alert, indexed: IndexedAlert | None):
+    """Hold an index change until commit; None removes the alert"""
+    session = object_session(alert)
+    if session is None:
+        _apply_change(alert.id, indexed)
+        return
+    session.info.setdefault(PENDING_CHANGES, []).append((alert.id, indexed))
+
+def _apply_change(alert_id: int, indexed: IndexedAlert | None):
+    if indexed is None:
+        alert_matcher.remove(alert_id)
+        return
+    alert_matcher.add_indexed(indexed)
+
+# Mapper events fire at flush time, so changes are snapshotted here and
+# only applied to the index once the transaction commits
+@event.listens_for(Alert, 'after_insert')
+@event.listens_for(Alert, 'after_update')
+def _index_alert(mapper, connection, alert):
+    """Keep the index current as alerts are created or changed"""
+    _queue_change(alert, AlertMatcher.to_indexed(alert))
+
+@event.listens_for(Alert, 'after_delete')
+def _unindex_alert(mapper, connection, alert):
+    """Keep the index current as alerts are deleted"""
+    _queue_change(alert, None)
+
+@event.listens_for(Session, 'after_commit')
+def _apply_pending_changes(session):
+    for alert_id, indexed in session.info.pop(PENDING_CHANGES, []):
+        _apply_change(alert_id, indexed)
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_pending_changes(session, previous_transaction):
+    session.info.pop(PENDING_CHANGES, None)
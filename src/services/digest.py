@@ -0,0 +1,154 @@
+"""
+Per-user digest batching of alert notifications
+"""
+
+import os
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+from sqlalchemy import func, select, delete
+from sqlalchemy.dialects.postgresql import insert
+from models import db, DigestEntry, User
+from .job_scraping import JobScrapingService
+
+logger = logging.getLogger(__name__)
+
+class DigestService:
+    """Service to buffer alert matches per user and render them as digests"""
+
+    def __init__(self):
+        # 0 sends every alert match immediately
+        self.window_minutes = int(os.getenv('DIGEST_WINDOW_MINUTES', '0'))
+        self.flush_interval = int(os.getenv('DIGEST_FLUSH_INTERVAL_SECONDS', '60'))
+        self.max_message_length = 4000  # Telegram limit is 4096
+        self.scraper = JobScrapingService()
+
+    @property
+    def enabled(self) -> bool:
+        """Alert matches are batched instead of sent immediately"""
+        return self.window_minutes > 0
+
+    def buffer(self, routed: Dict[int, List[tuple]]) -> int:
+        """
+        Add matched jobs to user buffers, de-duplicated across alerts
+
+        Args:
+            routed: Telegram id to (job, alert) pairs from the alert matcher
+
+        Returns:
+            Number of newly buffered jobs
+        """
+        rows = []
+        for pairs in routed.values():
+            for job, alert in pairs:
+                external_id = job.get('external_id') or job.get('id') or job.get('job_url')
+                if not external_id:
+                    continue
+                rows.append({
+                    'user_id': alert.user_id,
+                    'alert_id': alert.id,
+                    'search_term': alert.search_term,
+                    'site': job.get('site') or 'unknown',
+                    'external_id': str(external_id)[:255],
+                    'title': job.get('title'),
+                    'company': job.get('company'),
+                    'location': job.get('location'),
+                    'job_url': job.get('job_url'),
+                    'date_posted': job.get('date_posted'),
+                    'created_at': datetime.now(timezone.utc),
+                })
+        if not rows:
+            return 0
+
+        stmt = (
+            insert(DigestEntry)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=['user_id', 'site', 'external_id'])
+            .returning(DigestEntry.id)
+        )
+        buffered = len(db.session.execute(stmt).all())
+        db.session.commit()
+        logger.info(f"Buffered {buffered} jobs for {len(routed)} user digests")
+        return buffered
+
+    def pending_digests(self) -> List[tuple[int, List[tuple[str, List[int]]]]]:
+        """
+        Render digests for users whose oldest buffered job has waited a full window
+
+        Returns:
+            List of (telegram_id, [(message, entry ids in that message)])
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(minutes=self.window_minutes)
+        due_user_ids = db.session.execute(
+            select(DigestEntry.user_id)
+            .group_by(DigestEntry.user_id)
+            .having(func.min(DigestEntry.created_at) <= cutoff)
+        ).scalars().all()
+
+        digests = []
+        for user_id in due_user_ids:
+            user = db.session.get(User, user_id)
+            # Inactive users are not messaged, but their buffer is still cleared
+            if not user or not user.is_active:
+                self._clear_user(user_id)
+                continue
+            entries = DigestEntry.query.filter_by(user_id=user_id).order_by(DigestEntry.created_at).all()
+            digests.append((user.telegram_id, self.render(entries)))
+        return digests
+
+    def acknowledge(self, entry_ids: List[int]):
+        """Remove entries once their digest has been sent"""
+        if not entry_ids:
+            return
+        db.session.execute(delete(DigestEntry).where(DigestEntry.id.in_(entry_ids)))
+        db.session.commit()
+
+    def deactivate(self, telegram_id: int):
+        """Stop digests to a user who blocked the bot or whose chat is gone"""
+        user = User.query.filter_by(telegram_id=telegram_id).first()
+        if not user:
+            return
+        user.is_active = False
+        self._clear_user(user.id)
+        logger.info(f"Deactivated user {telegram_id}, digest chat unreachable")
+
+    def _clear_user(self, user_id: int):
+        """Drop every buffered entry of a user"""
+        db.session.execute(delete(DigestEntry).where(DigestEntry.user_id == user_id))
+        db.session.commit()
+
+    def render(self, entries: List[DigestEntry]) -> List[tuple[str, List[int]]]:
+        """
+        Render buffered jobs as few messages as fit Telegram's size limit
+
+        Returns:
+            List of (message, ids of the entries it contains)
+        """
+        search_terms = ', '.join(sorted({entry.search_term for entry in entries}))
+        header = f"🔔 **Job Alert Digest**\n"
+        header += f"**Alerts**: {search_terms}\n"
+        header += f"**New**: {len(entries)} jobs\n\n"
+
+        messages = []
+        current, current_ids = header, []
+        for i, entry in enumerate(entries, 1):
+            job_text = self.scraper.format_job_for_telegram(self._to_job(entry), i) + "\n"
+            if len(current) + len(job_text) > self.max_message_length and current_ids:
+                messages.append((current, current_ids))
+                current, current_ids = f"🔔 **Job Alert Digest** (continued)\n\n", []
+            current += job_text
+            current_ids.append(entry.id)
+        messages.append((current, current_ids))
+        return messages
+
+    @staticmethod
+    def _to_job(entry: DigestEntry) -> Dict:
+        """Convert a buffered entry to the JobSpy-like dict used for formatting"""
+        return {
+            'site': entry.site,
+            'title': entry.title or 'N/A',
+            'company': entry.company or 'N/A',
+            'location': entry.location or 'N/A',
+            'job_url': entry.job_url or '',
+            'date_posted': entry.date_posted or 'N/A',
+        }
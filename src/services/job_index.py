@@ -0,0 +1,93 @@
+"""
+Local full-text index over scraped jobs
+"""
+
+import os
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+from sqlalchemy import func, select, or_
+from models import db, Job
+
+logger = logging.getLogger(__name__)
+
+class JobIndexService:
+    """Service to answer searches from recently scraped jobs stored in Postgres"""
+
+    def __init__(self):
+        self.max_age_days = int(os.getenv('LOCAL_SEARCH_MAX_AGE_DAYS', '3'))
+        self.max_results = 20  # Limit results for Telegram display
+
+    def search(self, search_term: str, location: str | None = None) -> Dict:
+        """
+        Search fresh local jobs ranked by title match and recency
+
+        Args:
+            search_term: Job search keywords
+            location: Job location (city, state/province)
+
+        Returns:
+            Dict in the same shape as JobScrapingService.search_jobs
+        """
+        query = func.websearch_to_tsquery('english', search_term)
+        cutoff = datetime.now(timezone.utc).date() - timedelta(days=self.max_age_days)
+
+        # Title is weighted 'A' in search_vector, so ts_rank_cd favours title hits;
+        # dividing by age in days decays older postings
+        age_days = func.greatest(func.current_date() - Job.date_posted, 0)
+        score = func.ts_rank_cd(Job.search_vector, query) / (1 + age_days)
+
+        stmt = (
+            select(Job)
+            .where(Job.search_vector.op('@@')(query))
+            .where(Job.date_posted >= cutoff)  # Also prunes old partitions
+            .order_by(score.desc(), Job.scraped_at.desc())
+            .limit(self.max_results)
+        )
+        location_filter = self._location_filter(location)
+        if location_filter is not None:
+            stmt = stmt.where(location_filter)
+
+        jobs = [self._to_dict(job) for job in db.session.execute(stmt).scalars()]
+        logger.info(f"Local index returned {len(jobs)} jobs for '{search_term}' in '{location}'")
+
+        if not jobs:
+            return {
+                'success': False,
+                'message': f"No local jobs found for '{search_term}' in '{location}'"
+            }
+
+        return {
+            'success': True,
+            'jobs': jobs,
+            'count': len(jobs),
+            'search_term': search_term,
+            'location': location,
+            'source': 'local'
+        }
+
+    def _location_filter(self, location: str | None):
+        """Build a location condition, matching on the city part only"""
+        if not location:
+            return None
+        city = location.split(',')[0].strip()
+        if not city:
+            return None
+        if city.lower() == 'remote':
+            return or_(Job.is_remote.is_(True), Job.location.ilike('%remote%'))
+        # Escape so '%' and '_' typed by the user match literally
+        return Job.location.icontains(city, autoescape=True)
+
+    @staticmethod
+    def _to_dict(job: Job) -> Dict:
+        """Convert a Job row to the JobSpy-like dict used for formatting"""
+        return {
+            'id': job.external_id,
+            'site': job.site,
+            'title': job.title,
+            'company': job.company,
+            'location': job.location,
+            'job_url': job.job_url,
+            'date_posted': job.date_posted,
+            'is_remote': job.is_remote,
+        }
@@ -0,0 +1,186 @@
+"""
+Job Ingestion Service for bulk persisting scraped jobs
+"""
+
+import os
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List
+import pandas as pd
+from sqlalchemy import select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from models import db, Job
+
+logger = logging.getLogger(__name__)
+
+# Partitions already known to exist in this process, to avoid repeating DDL per batch
+_known_partitions: set[str] = set()
+
+class JobIngestionService:
+    """Service to bulk insert scraped jobs into the date-partitioned jobs table"""
+
+    def __init__(self):
+        self.batch_size = int(os.getenv('JOBS_INGEST_BATCH_SIZE', '500'))
+        self.retention_days = int(os.getenv('JOBS_RETENTION_DAYS', '30'))
+
+    def ingest(self, jobs: Iterable[Dict]) -> List[Dict]:
+        """
+        Insert jobs in multi-row batches, skipping already stored postings
+
+        Args:
+            jobs: Job dictionaries from JobSpy
+
+        Returns:
+            List of normalized rows that were newly inserted
+        """
+        cutoff = self._retention_cutoff()
+        rows = [row for row in (self._to_row(job) for job in jobs) if row]
+        # Rows older than retention would land in partitions that are about to be dropped
+        rows = [row for row in rows if row['date_posted'] >= cutoff]
+        # A posting without date_posted is dated by the day it is scraped, so the
+        # partition key is not stable across days; deduplicate on (site, external_id)
+        rows = self._drop_stored(self._unique(rows))
+        if not rows:
+            return []
+
+        self._ensure_partitions({row['date_posted'] for row in rows})
+
+        inserted_keys = set()
+        for start in range(0, len(rows), self.batch_size):
+            chunk = rows[start:start + self.batch_size]
+            stmt = (
+                insert(Job)
+                .values(chunk)
+                .on_conflict_do_nothing(index_elements=['site', 'external_id', 'date_posted'])
+                .returning(Job.site, Job.external_id, Job.date_posted)
+            )
+            result = db.session.execute(stmt)
+            inserted_keys.update(tuple(key) for key in result)
+        db.session.commit()
+
+        new_rows = [
+            row for row in rows
+            if (row['site'], row['external_id'], row['date_posted']) in inserted_keys
+        ]
+        logger.info(f"Ingested {len(new_rows)} new jobs out of {len(rows)}")
+        return new_rows
+
+    def drop_expired_partitions(self) -> List[str]:
+        """
+        Drop daily partitions older than the retention window
+
+        Returns:
+            Names of dropped partitions
+        """
+        cutoff = self._retention_cutoff()
+        partitions = db.session.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :parent"
+        ), {'parent': Job.__tablename__}).scalars().all()
+
+        dropped = []
+        for name in partitions:
+            try:
+                day = datetime.strptime(name.removeprefix(f"{Job.__tablename__}_"), '%Y%m%d').date()
+            except ValueError:
+                logger.warning(f"Skipping unexpected partition name: {name}")
+                continue
+            if day >= cutoff:
+                continue
+            db.session.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+            _known_partitions.discard(name)
+            dropped.append(name)
+        db.session.commit()
+
+        if dropped:
+            logger.info(f"Dropped {len(dropped)} expired job partitions")
+        return dropped
+
+    @staticmethod
+    def _unique(rows: List[Dict]) -> List[Dict]:
+        """Keep the first row per (site, external_id)"""
+        seen = set()
+        unique_rows = []
+        for row in rows:
+            key = (row['site'], row['external_id'])
+            if key in seen:
+                continue
+            seen.add(key)
+            unique_rows.append(row)
+        return unique_rows
+
+    def _drop_stored(self, rows: List[Dict]) -> List[Dict]:
+        """Remove rows whose posting is already stored under any posting date"""
+        stored = set()
+        for start in range(0, len(rows), self.batch_size):
+            keys = [(row['site'], row['external_id']) for row in rows[start:start + self.batch_size]]
+            result = db.session.execute(
+                select(Job.site, Job.external_id).where(tuple_(Job.site, Job.external_id).in_(keys))
+            )
+            stored.update(tuple(key) for key in result)
+        return [row for row in rows if (row['site'], row['external_id']) not in stored]
+
+    def _retention_cutoff(self) -> date:
+        """First posting date that is still kept"""
+        return datetime.now(timezone.utc).date() - timedelta(days=self.retention_days)
+
+    def _ensure_partitions(self, days: set[date]):
+        """Create missing daily partitions for the given posting dates"""
+        for day in sorted(days):
+            name = f"{Job.__tablename__}_{day:%Y%m%d}"
+            if name in _known_partitions:
+                continue
+            db.session.execute(text(
+                f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF {Job.__tablename__} '
+                f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+            ))
+            _known_partitions.add(name)
+        db.session.commit()
+
+    def _to_row(self, job: Dict) -> Dict | None:
+        """Normalize a JobSpy record into a jobs table row"""
+        site = self._clean(job.get('site'))
+        external_id = self._clean(job.get('id')) or self._clean(job.get('job_url'))
+        if not site or not external_id:
+            return None
+
+        is_remote = self._clean(job.get('is_remote'))
+        return {
+            'site': str(site),
+            'external_id': str(external_id)[:255],
+            'date_posted': self._to_date(self._clean(job.get('date_posted'))),
+            'title': self._clean(job.get('title')),
+            'company': self._clean(job.get('company')),
+            'location': self._clean(job.get('location')),
+            'job_url': self._clean(job.get('job_url')),
+            'is_remote': bool(is_remote) if is_remote is not None else None,
+            'scraped_at': datetime.now(timezone.utc),
+        }
+
+    @staticmethod
+    def _clean(value):
+        """Convert pandas missing values to None"""
+        if value is None:
+            return None
+        try:
+            if pd.isna(value):
+                return None
+        except (TypeError, ValueError):
+            pass
+        return value
+
+    @staticmethod
+    def _to_date(value) -> date:
+        """Coerce JobSpy date_posted to a date, defaulting to today (see ingest)"""
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        if isinstance(value, str):
+            try:
+                return date.fromisoformat(value[:10])
+            except ValueError:
+                pass
+        return datetime.now(timezone.utc).date()
@@ -2,25 +2,84 @@
 Job Scraping Service using JobSpy
 """
 
+import os
+import math
+import asyncio
 import logging
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from typing import Dict, List, Optional
 from jobspy import scrape_jobs
 import pandas as pd
+from .scrape_watermarks import ScrapeWatermarkStore, normalize_query
+from .site_health import CircuitState, site_health, negative_cache
+
+# Negative cache marker for a scrape that succeeded with no jobs
+EMPTY_RESULT = 'empty'
 
 logger = logging.getLogger(__name__)
 
+class _JobSpyErrorCollector(logging.Handler):
+    """Collect error records JobSpy logs instead of raising"""
+    
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.messages: List[str] = []
+    
+    def emit(self, record: logging.LogRecord):
+        # Every collector on the logger sees the record; only the first claims it
+        if getattr(record, 'jobspy_error_claimed', False):
+            return
+        record.jobspy_error_claimed = True
+        self.messages.append(record.getMessage())
+
+@contextmanager
+def capture_jobspy_errors(site: str):
+    """
+    Capture errors JobSpy swallows for a site
+    
+    On non-200 responses (rate limits, blocks) and scraper exceptions JobSpy
+    logs to its 'JobSpy:<Scraper>' logger and returns an empty DataFrame.
+    Concurrent scrapes of the same site share that logger, so each error is
+    collected by only one of them and counts as a single breaker failure.
+    
+    Yields:
+        List filled with error messages logged during the block
+    """
+    collector = _JobSpyErrorCollector()
+    site_key = site.replace('_', '').lower()
+    loggers = [
+        logging.getLogger(name) for name in list(logging.Logger.manager.loggerDict)
+        if name.startswith('JobSpy:') and name.split(':', 1)[1].lower() == site_key
+    ]
+    for jobspy_logger in loggers:
+        jobspy_logger.addHandler(collector)
+    try:
+        yield collector.messages
+    finally:
+        for jobspy_logger in loggers:
+            jobspy_logger.removeHandler(collector)
+
 class JobScrapingService:
     """Service to handle job scraping using JobSpy"""
     
     def __init__(self):
         self.default_site_name = ["indeed"]
+        # Boards to try instead while a requested board is unhealthy
+        self.fallback_site_name = [site for site in os.getenv('SCRAPE_FALLBACK_SITES', '').split(',') if site]
         self.max_results = 20  # Limit results for Telegram display
+        self.default_hours_old = int(os.getenv('SCRAPE_DEFAULT_HOURS_OLD', '24'))
+        self.max_hours_old = int(os.getenv('SCRAPE_MAX_HOURS_OLD', '72'))
+        # Fetched in one call: JobSpy applies offsets client-side, so paging re-downloads
+        self.max_scrape_results = int(os.getenv('SCRAPE_MAX_RESULTS', '60'))
+        self.watermarks = ScrapeWatermarkStore()
     
     async def search_jobs(
         self, 
         search_term: str, 
         location: str | None = None,
-        site_name: List[str] | None = None
+        site_name: List[str] | None = None,
+        only_new: bool = False
     ) -> Dict:
         """
         Search for jobs using JobSpy
@@ -29,6 +88,9 @@ class JobScrapingService:
             search_term: Job search keywords
             location: Job location (city, state/province)
             site_name: List of job sites to search
+            only_new: Fetch only the window since the last complete scrape of
+                the query and drop postings already stored (background and
+                alert scrapes); interactive searches always use the full window
 
         Returns:
             Dict with jobs data or error info
@@ -54,24 +116,34 @@ class JobScrapingService:
                     country_indeed = 'canada'
                     logger.info(f"Detected Canadian location, using country_indeed='canada'")
 
-            # Search using JobSpy
-            jobs_df = scrape_jobs(
-                site_name=site_name,
-                search_term=search_term,
-                location=location,
-                results_wanted=self.max_results,
-                country_indeed=country_indeed,
-                hours_old=2  # Search jobs posted in last 2 hours
-            )
+            query_key = normalize_query(search_term, location)
+            jobs_list = []
+            errors = []
+            sites = list(site_name)
+            fallbacks = [site for site in self.fallback_site_name if site not in sites]
+            for site in sites:  # Grows with fallbacks while iterating
+                site_jobs, error = await self._search_site(
+                    site, query_key, search_term, location, country_indeed, only_new
+                )
+                jobs_list += site_jobs
+                if not error:
+                    continue
+                errors.append(f"{site}: {error}")
+                # Degrade to another board while this one is unhealthy
+                if fallbacks:
+                    sites.append(fallbacks.pop(0))
             
-            if jobs_df.empty:
+            if not jobs_list and len(errors) == len(sites):
                 return {
                     'success': False,
-                    'message': f"No jobs found for '{search_term}' in '{location}'"
+                    'message': f"Search failed: {'; '.join(errors)}"
                 }
             
-            # Convert to list of dictionaries for easy handling
-            jobs_list = jobs_df.to_dict('records')
+            if not jobs_list:
+                return {
+                    'success': False,
+                    'message': f"No {'new ' if only_new else ''}jobs found for '{search_term}' in '{location}'"
+                }
             
             logger.info(f"✅ Found {len(jobs_list)} jobs")
             
@@ -90,6 +162,155 @@ class JobScrapingService:
                 'message': f"Search failed: {str(e)}"
             }
     
+    async def _search_site(
+        self,
+        site: str,
+        query_key: str,
+        search_term: str,
+        location: str | None,
+        country_indeed: str,
+        only_new: bool
+    ) -> tuple[List[Dict], str | None]:
+        """
+        Search one site through its negative cache and circuit breaker
+        
+        Returns:
+            Tuple of jobs and an error message (None on success)
+        """
+        # Recently empty or failed queries are answered without scraping
+        cached = negative_cache.get(query_key, site)
+        if cached == EMPTY_RESULT:
+            return [], None
+        if cached:
+            return [], cached
+        
+        breaker = site_health.breaker(site)
+        admitted = breaker.allow_request()
+        if not admitted:
+            return [], f"temporarily unavailable, retry in {breaker.retry_in():.0f}s"
+        probe = admitted == CircuitState.HALF_OPEN
+        
+        # Isolate failures so one board does not break the others
+        try:
+            site_jobs, error = await self._scrape_window(
+                site, query_key, search_term, location, country_indeed, only_new
+            )
+        except Exception as e:
+            logger.error(f"Job search failed on {site}: {e}")
+            site_jobs, error = [], str(e)
+        finally:
+            # A cancelled probe must not leave the site blocked in half-open
+            if probe:
+                breaker.release_probe()
+        
+        if error:
+            breaker.record_failure(error, probe)
+            if not site_jobs:
+                negative_cache.put(query_key, site, error)
+                return [], error
+        else:
+            breaker.record_success(probe)
+            # An empty delta window says nothing about a full interactive search
+            if not site_jobs and not only_new:
+                negative_cache.put(query_key, site, EMPTY_RESULT)
+        
+        if only_new:
+            site_jobs = self._drop_seen(site, site_jobs)
+        return site_jobs, error
+    
+    async def _scrape_window(
+        self,
+        site: str,
+        query_key: str,
+        search_term: str,
+        location: str | None,
+        country_indeed: str,
+        only_new: bool
+    ) -> tuple[List[Dict], str | None]:
+        """
+        Scrape one site, for only_new scrapes just the delta window since its watermark
+        
+        Returns:
+            Tuple of jobs posted within the window and the first error JobSpy
+            logged (None on success)
+        """
+        started_at = datetime.now(timezone.utc)
+        window = self._window_hours(query_key, site, started_at)
+        if not only_new:
+            # A recent scrape by someone else must not shrink a user's search;
+            # the window still covers the delta so the watermark may advance
+            window = max(window, self._first_run_hours())
+        logger.info(f"Scraping {site} for '{query_key}' with hours_old={window}")
+        
+        with capture_jobspy_errors(site) as errors:
+            # Search using JobSpy (blocking, so run outside the event loop)
+            jobs_df = await asyncio.to_thread(
+                scrape_jobs,
+                site_name=[site],
+                search_term=search_term,
+                location=location,
+                results_wanted=self.max_scrape_results,
+                country_indeed=country_indeed,
+                hours_old=window  # Only the window since the last successful scrape
+            )
+        
+        # Convert to list of dictionaries for easy handling
+        jobs = jobs_df.to_dict('records')
+        
+        if errors:
+            logger.warning(f"JobSpy reported an error on {site}: {errors[0]}")
+            # Keep the watermark so the next scrape covers what this one missed
+            return jobs, errors[0]
+        
+        if len(jobs) >= self.max_scrape_results:
+            # Results come by relevance, so a truncated window may have missed
+            # postings; look back from the same watermark next time
+            logger.info(f"Scrape of {site} for '{query_key}' hit {self.max_scrape_results} results, keeping watermark")
+            return jobs, None
+        
+        try:
+            self.watermarks.advance(query_key, site, started_at)
+        except Exception as e:
+            logger.warning(f"Watermark update failed: {e}")
+        return jobs, None
+    
+    def _first_run_hours(self) -> int:
+        """Window for a query without a watermark"""
+        return min(self.default_hours_old, self.max_hours_old)
+    
+    def _window_hours(self, query_key: str, site: str, now: datetime) -> int:
+        """Hours to look back: time since the watermark, or the first-run window"""
+        try:
+            last_scraped_at = self.watermarks.get(query_key, site)
+        except Exception as e:
+            logger.warning(f"Watermark lookup failed: {e}")
+            last_scraped_at = None
+        
+        if last_scraped_at is None:
+            return self._first_run_hours()
+        
+        elapsed_hours = (now - last_scraped_at).total_seconds() / 3600
+        return max(1, min(self.max_hours_old, math.ceil(elapsed_hours)))
+    
+    def _drop_seen(self, site: str, jobs: List[Dict]) -> List[Dict]:
+        """Remove postings already stored, keeping all if storage is unavailable"""
+        try:
+            seen = self.watermarks.seen_ids(site, [key for key in map(self._job_key, jobs) if key])
+        except Exception as e:
+            logger.warning(f"Seen postings lookup failed: {e}")
+            return jobs
+        # Results come in relevance order, so seen postings can be anywhere in the list
+        return [job for job in jobs if self._job_key(job) not in seen]
+    
+    @staticmethod
+    def _job_key(job: Dict) -> str | None:
+        """Posting identifier matching Job.external_id"""
+        for field in ('id', 'job_url'):
+            value = job.get(field)
+            if value is not None and not pd.isna(value):
+                return str(value)[:255]
+        return None
+    
     def format_job_for_telegram(self, job: Dict, index: int) -> str:
         """
         Format a single job posting for Telegram display
@@ -149,7 +370,14 @@ class JobScrapingService:
             return f"No jobs found for '{search_term}' in '{location}'"
         
         # Header
-        header = f"🔍 **Search Results**\n"
+        if result.get('source') == 'local':
+            header = f"⚡ **Recent Results**\n"
+        elif result.get('source') == 'refresh':
+            header = f"🆕 **New Jobs**\n"
+        elif result.get('source') == 'alert':
+            header = f"🔔 **Job Alert**\n"
+        else:
+            header = f"🔍 **Search Results**\n"
         header += f"**Query**: {search_term}\n"
         if location:
             header += f"**Location**: {location}\n"
@@ -0,0 +1,194 @@
+"""
+Weighted fair scheduling of scrape work across users and work classes
+"""
+
+import os
+import heapq
+import asyncio
+import logging
+import itertools
+from collections import Counter
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+class WorkClass(str, Enum):
+    """Kinds of scrape work competing for workers"""
+    INTERACTIVE = 'interactive'
+    BACKGROUND = 'background'
+
+class QuotaExceeded(Exception):
+    """User already has the maximum number of scrapes queued or running"""
+
+@dataclass(order=True)
+class _Request:
+    finish_tag: float
+    seq: int
+    user_id: int = field(compare=False)
+    work_class: WorkClass = field(compare=False)
+    factory: Callable[[], Awaitable[Any]] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    started: bool = field(default=False, compare=False)
+
+@dataclass
+class Ticket:
+    """Handle for a submitted scrape"""
+    position: int  # 0 when started immediately
+    eta: float  # Estimated seconds until the scrape starts
+    future: asyncio.Future
+
+class ScrapeScheduler:
+    """
+    Weighted fair queue in front of JobScrapingService
+
+    Every (user, work class) pair is a separate flow. A request's virtual
+    finish tag advances by 1/weight of its class from the later of the
+    scheduler's virtual time and the flow's previous tag, so one user
+    queueing many scrapes only delays themselves, and interactive searches
+    overtake background work by the ratio of class weights. Workers are
+    capped and some are kept free of background work so interactive
+    latency stays bounded under bursts of alert runs.
+    """
+
+    def __init__(self):
+        self.concurrency = int(os.getenv('SCRAPE_CONCURRENCY', '4'))
+        # Separate quotas so background refreshes never block a user's own searches
+        self.user_quotas = {
+            WorkClass.INTERACTIVE: int(os.getenv('SCRAPE_USER_QUOTA', '2')),
+            WorkClass.BACKGROUND: int(os.getenv('SCRAPE_BACKGROUND_USER_QUOTA', '1')),
+        }
+        self.weights = {
+            WorkClass.INTERACTIVE: float(os.getenv('SCRAPE_INTERACTIVE_WEIGHT', '4')),
+            WorkClass.BACKGROUND: float(os.getenv('SCRAPE_BACKGROUND_WEIGHT', '1')),
+        }
+        # Workers background work may never occupy
+        reserved = int(os.getenv('SCRAPE_RESERVED_INTERACTIVE', '1'))
+        if reserved >= self.concurrency:
+            # Background work still needs one worker or refreshes never run
+            logger.warning(
+                f"SCRAPE_RESERVED_INTERACTIVE={reserved} leaves no worker for background scrapes "
+                f"with SCRAPE_CONCURRENCY={self.concurrency}, reserving {self.concurrency - 1}"
+            )
+            reserved = self.concurrency - 1
+        self.background_limit = self.concurrency - reserved
+
+        self._queues: Dict[WorkClass, List[_Request]] = {work_class: [] for work_class in WorkClass}
+        self._running: Counter = Counter()
+        self._flow_load: Counter = Counter()  # Queued plus running per (user, work class)
+        self._flow_tags: Dict[tuple[int, WorkClass], float] = {}
+        self._virtual_time = 0.0
+        self._seq = itertools.count()
+        self._avg_service_time = 5.0  # Seconds, updated as scrapes complete
+        self._tasks: set[asyncio.Task] = set()  # Keep running scrapes referenced
+
+    def submit(self, user_id: int, work_class: WorkClass, factory: Callable[[], Awaitable[Any]]) -> Ticket:
+        """
+        Queue a scrape
+
+        Args:
+            user_id: Telegram id of the user the work is for
+            work_class: Interactive search or background run
+            factory: Callable creating the scrape coroutine when a worker is free
+
+        Returns:
+            Ticket with queue position, ETA and a future for the result
+
+        Raises:
+            QuotaExceeded: User has too many scrapes of this class queued or running
+        """
+        flow = (user_id, work_class)
+        if self._flow_load[flow] >= self.user_quotas[work_class]:
+            raise QuotaExceeded(f"User {user_id} has {self._flow_load[flow]} {work_class.value} scrapes pending")
+
+        start_tag = max(self._virtual_time, self._flow_tags.get(flow, 0.0))
+        finish_tag = start_tag + 1 / self.weights[work_class]
+        self._flow_tags[flow] = finish_tag
+
+        request = _Request(
+            finish_tag=finish_tag,
+            seq=next(self._seq),
+            user_id=user_id,
+            work_class=work_class,
+            factory=factory,
+            future=asyncio.get_running_loop().create_future()
+        )
+        heapq.heappush(self._queues[work_class], request)
+        self._flow_load[flow] += 1
+        self._dispatch()
+
+        if request.started:
+            return Ticket(position=0, eta=0.0, future=request.future)
+
+        position = 1 + sum(
+            1 for queue in self._queues.values() for queued in queue if queued < request
+        )
+        eta = -(-position // self.concurrency) * self._avg_service_time
+        return Ticket(position=position, eta=eta, future=request.future)
+
+    async def run(self, user_id: int, work_class: WorkClass, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Submit a scrape and return its result"""
+        return await self.submit(user_id, work_class, factory).future
+
+    def stats(self) -> Dict:
+        """Queue and worker usage per work class"""
+        return {
+            work_class.value: {'queued': len(self._queues[work_class]), 'running': self._running[work_class]}
+            for work_class in WorkClass
+        }
+
+    def _dispatch(self):
+        """Start queued requests in finish tag order while workers are free"""
+        while sum(self._running.values()) < self.concurrency:
+            request = self._next_request()
+            if request is None:
+                return
+            heapq.heappop(self._queues[request.work_class])
+            self._virtual_time = max(self._virtual_time, request.finish_tag - 1 / self.weights[request.work_class])
+            self._running[request.work_class] += 1
+            request.started = True
+            task = asyncio.create_task(self._execute(request))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _next_request(self) -> _Request | None:
+        """Head of the queue with the smallest tag that may start now"""
+        heads = []
+        for work_class, queue in self._queues.items():
+            if not queue:
+                continue
+            if work_class == WorkClass.BACKGROUND and self._running[work_class] >= self.background_limit:
+                continue
+            heads.append(queue[0])
+        return min(heads, default=None)
+
+    async def _execute(self, request: _Request):
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        try:
+            result = await request.factory()
+            if not request.future.done():
+                request.future.set_result(result)
+        except Exception as e:
+            logger.error(f"Scheduled scrape for user {request.user_id} failed: {e}")
+            if not request.future.done():
+                request.future.set_exception(e)
+        finally:
+            # A cancelled scrape must not leave run() waiting forever
+            if not request.future.done():
+                request.future.cancel()
+            # Exponential moving average keeps ETAs close to recent scrape times
+            self._avg_service_time = 0.8 * self._avg_service_time + 0.2 * (loop.time() - started_at)
+            self._running[request.work_class] -= 1
+            flow = (request.user_id, request.work_class)
+            self._flow_load[flow] -= 1
+            if not self._flow_load[flow]:
+                # Forget idle flows so state stays bounded; their next request
+                # starts at the current virtual time like any new flow
+                del self._flow_load[flow]
+                self._flow_tags.pop(flow, None)
+            self._dispatch()
+
+# Shared by all bot handlers in this process
+scrape_scheduler = ScrapeScheduler()
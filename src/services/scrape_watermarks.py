@@ -0,0 +1,57 @@
+"""
+Scrape watermark tracking for incremental job scraping
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Iterable
+from models import db, Job, ScrapeWatermark
+
+logger = logging.getLogger(__name__)
+
+def normalize_query(search_term: str, location: str | None) -> str:
+    """Build a stable key for a search term and location pair"""
+    term = ' '.join(search_term.lower().split())
+    place = ' '.join((location or '').lower().split())
+    return f"{term}|{place}"
+
+class ScrapeWatermarkStore:
+    """Store last successful scrape times per normalized query and site"""
+
+    def get(self, query_key: str, site: str) -> datetime | None:
+        """Get last successful scrape time, or None if never scraped"""
+        with self._app_context():
+            watermark = ScrapeWatermark.query.filter_by(query_key=query_key, site=site).first()
+            if not watermark:
+                return None
+            # Stored as naive UTC
+            return watermark.last_scraped_at.replace(tzinfo=timezone.utc)
+
+    def advance(self, query_key: str, site: str, scraped_at: datetime):
+        """Move the watermark forward after a successful scrape"""
+        with self._app_context():
+            watermark = ScrapeWatermark.query.filter_by(query_key=query_key, site=site).first()
+            scraped_at = scraped_at.astimezone(timezone.utc).replace(tzinfo=None)
+            if not watermark:
+                db.session.add(ScrapeWatermark(query_key=query_key, site=site, last_scraped_at=scraped_at))
+            elif watermark.last_scraped_at < scraped_at:
+                watermark.last_scraped_at = scraped_at
+            db.session.commit()
+
+    def seen_ids(self, site: str, external_ids: Iterable[str]) -> set[str]:
+        """Return which of the given postings are already stored"""
+        external_ids = list(external_ids)
+        if not external_ids:
+            return set()
+        with self._app_context():
+            rows = db.session.query(Job.external_id).filter(
+                Job.site == site,
+                Job.external_id.in_(external_ids)
+            ).all()
+            return {row.external_id for row in rows}
+
+    @staticmethod
+    def _app_context():
+        """Database access from the bot runs outside Flask request handling"""
+        from app import app
+        return app.app_context()
@@ -0,0 +1,175 @@
+"""
+Per-site health tracking with circuit breakers and negative-result caching
+"""
+
+import os
+import time
+import random
+import logging
+import threading
+from enum import Enum
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+class CircuitState(str, Enum):
+    """Circuit breaker states"""
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+class CircuitBreaker:
+    """Circuit breaker for a single job board"""
+
+    def __init__(self, site: str, failure_threshold: int, base_backoff: float, max_backoff: float):
+        self.site = site
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0  # Consecutive openings, drives exponential backoff
+        self.open_until = 0.0
+        self.probe_in_flight = False
+        self.last_error: str | None = None
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> CircuitState | None:
+        """
+        Check if a scrape may run; moves an expired open breaker to half-open
+
+        Returns:
+            None if the scrape is refused, otherwise the state it was admitted
+            in; HALF_OPEN marks the probe, whose outcome decides the state
+        """
+        with self._lock:
+            if self.state == CircuitState.CLOSED:
+                return CircuitState.CLOSED
+            if self.state == CircuitState.OPEN:
+                if time.monotonic() < self.open_until:
+                    return None
+                logger.info(f"Circuit for {self.site} half-open, sending probe")
+                self.state = CircuitState.HALF_OPEN
+            # Half-open lets a single probe through
+            if self.probe_in_flight:
+                return None
+            self.probe_in_flight = True
+            return CircuitState.HALF_OPEN
+
+    def record_success(self, probe: bool = False):
+        """Close the breaker after a successful scrape"""
+        with self._lock:
+            # Scrapes admitted before the breaker opened do not speak for the site now
+            if self.state != CircuitState.CLOSED and not probe:
+                return
+            if self.state != CircuitState.CLOSED:
+                logger.info(f"Circuit for {self.site} closed")
+            self.state = CircuitState.CLOSED
+            self.consecutive_failures = 0
+            self.trips = 0
+            self.probe_in_flight = False
+            self.last_error = None
+
+    def record_failure(self, error: str, probe: bool = False):
+        """Count a failure and open the breaker once the threshold is reached"""
+        with self._lock:
+            self.last_error = error
+            # Requests in flight when the breaker opened must not extend the backoff
+            if self.state == CircuitState.OPEN or (self.state == CircuitState.HALF_OPEN and not probe):
+                return
+            self.consecutive_failures += 1
+            self.probe_in_flight = False
+            if self.state != CircuitState.HALF_OPEN and self.consecutive_failures < self.failure_threshold:
+                return
+            self._trip()
+
+    def release_probe(self):
+        """Let another probe through if the probe ended without a result (probe only)"""
+        with self._lock:
+            self.probe_in_flight = False
+
+    def retry_in(self) -> float:
+        """Seconds until the breaker allows a probe"""
+        with self._lock:
+            if self.state != CircuitState.OPEN:
+                return 0.0
+            return max(0.0, self.open_until - time.monotonic())
+
+    def snapshot(self) -> Dict:
+        """Breaker state for the health endpoint"""
+        return {
+            'state': self.state.value,
+            'consecutive_failures': self.consecutive_failures,
+            'retry_in_seconds': round(self.retry_in()),
+            'last_error': self.last_error,
+        }
+
+    def _trip(self):
+        """Open the breaker with exponential backoff and jitter (lock held)"""
+        self.trips += 1
+        backoff = min(self.max_backoff, self.base_backoff * 2 ** (self.trips - 1))
+        # Equal jitter keeps at least half the backoff while spreading retries
+        backoff = random.uniform(backoff / 2, backoff)
+        self.open_until = time.monotonic() + backoff
+        self.state = CircuitState.OPEN
+        logger.warning(f"Circuit for {self.site} opened for {backoff:.0f}s after {self.consecutive_failures} failures")
+
+class NegativeResultCache:
+    """Short-TTL cache of empty or failed results per query and site"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[tuple[str, str], tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, query_key: str, site: str) -> str | None:
+        """Get cached outcome ('empty' or error message) if still fresh"""
+        with self._lock:
+            entry = self._entries.get((query_key, site))
+            if not entry:
+                return None
+            expires_at, outcome = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[(query_key, site)]
+                return None
+            return outcome
+
+    def put(self, query_key: str, site: str, outcome: str):
+        """Cache an empty or failed outcome"""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[(query_key, site)] = (time.monotonic() + self.ttl, outcome)
+            # Drop expired entries so the cache stays bounded by the TTL
+            now = time.monotonic()
+            for key in [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]:
+                del self._entries[key]
+
+class SiteHealthRegistry:
+    """Circuit breakers for all job boards in this process"""
+
+    def __init__(self):
+        self.failure_threshold = int(os.getenv('SITE_FAILURE_THRESHOLD', '3'))
+        self.base_backoff = float(os.getenv('SITE_BACKOFF_BASE_SECONDS', '60'))
+        self.max_backoff = float(os.getenv('SITE_BACKOFF_MAX_SECONDS', '1800'))
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, site: str) -> CircuitBreaker:
+        """Get or create the breaker for a site"""
+        with self._lock:
+            if site not in self._breakers:
+                self._breakers[site] = CircuitBreaker(
+                    site, self.failure_threshold, self.base_backoff, self.max_backoff
+                )
+            return self._breakers[site]
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """States of all known breakers"""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.site: breaker.snapshot() for breaker in breakers}
+
+# Shared by the bot and the Flask health endpoint
+site_health = SiteHealthRegistry()
+negative_cache = NegativeResultCache(ttl=float(os.getenv('NEGATIVE_CACHE_TTL_SECONDS', '300')))
@@ -6,11 +6,13 @@ import os
 import asyncio
 import logging
 from aiogram import Bot, Dispatcher
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
 from aiogram.filters import Command
 from aiogram.types import Message
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.fsm.storage.memory import MemoryStorage
+from .scrape_scheduler import scrape_scheduler, WorkClass, QuotaExceeded
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -31,6 +33,213 @@ if not bot_token:
 bot = Bot(token=bot_token)
 dp = Dispatcher(storage=MemoryStorage())
 
+# Refresh local results from job boards after answering from the index
+background_refresh_enabled = os.getenv('LOCAL_SEARCH_BACKGROUND_REFRESH', 'true').lower() == 'true'
+
+# Keep references to background tasks so they are not garbage collected
+background_tasks: set[asyncio.Task] = set()
+
+def search_local_jobs(search_term: str, location: str) -> dict:
+    """Search recently scraped jobs in the local index"""
+    try:
+        from .job_index import JobIndexService
+        from app import app
+        
+        with app.app_context():
+            return JobIndexService().search(search_term, location)
+    except Exception as e:
+        logger.error(f"Local search error: {e}")
+        return {'success': False, 'message': 'Local search unavailable'}
+
+def ingest_jobs(jobs: list[dict]) -> list[dict]:
+    """Persist scraped jobs and return the newly stored ones"""
+    try:
+        from .job_ingestion import JobIngestionService
+        from app import app
+        
+        with app.app_context():
+            return JobIngestionService().ingest(jobs)
+    except Exception as e:
+        logger.error(f"Job ingestion error: {e}")
+        return []
+
+# Pause between proactive messages to stay under Telegram's ~30 messages/s limit
+notification_interval = 1 / 25
+
+# Alert notifications for the single sender task, so the limit holds across handlers
+notification_queue: asyncio.Queue[tuple[int, str]] = asyncio.Queue()
+
+async def send_with_retry(bot: Bot, chat_id: int, text: str, attempts: int = 3):
+    """Send a proactive message, waiting out Telegram flood limits"""
+    parse_mode = "Markdown"
+    for attempt in range(1, attempts + 1):
+        try:
+            return await bot.send_message(chat_id, text, parse_mode=parse_mode)
+        except TelegramRetryAfter as e:
+            if attempt == attempts:
+                raise
+            logger.warning(f"Flood limit sending to {chat_id}, retrying in {e.retry_after}s")
+            await asyncio.sleep(e.retry_after)
+        except TelegramBadRequest as e:
+            # Scraped titles and companies can contain stray '_', '*' or '['
+            if parse_mode is None or attempt == attempts or "can't parse entities" not in str(e).lower():
+                raise
+            logger.warning(f"Markdown rejected for {chat_id}, sending as plain text: {e}")
+            parse_mode = None
+
+def match_alert_users(jobs: list[dict]) -> dict[int, list[tuple]]:
+    """Route jobs to active users whose alerts match, keyed by Telegram id"""
+    try:
+        from .alert_matcher import alert_matcher
+        from models import User
+        from app import app
+        
+        routed = alert_matcher.match_jobs(jobs)
+        if not routed:
+            return {}
+        with app.app_context():
+            users = User.query.filter(User.id.in_(routed.keys()), User.is_active.is_(True)).all()
+            return {user.telegram_id: routed[user.id] for user in users}
+    except Exception as e:
+        logger.error(f"Alert matching error: {e}")
+        return {}
+
+def notify_alert_matches(jobs: list[dict], exclude_telegram_id: int | None = None):
+    """Queue newly ingested jobs for every user with a matching alert"""
+    if not jobs:
+        return
+    
+    from .job_scraping import JobScrapingService
+    
+    # The searching user already sees these jobs in the search reply
+    routed = {
+        telegram_id: pairs for telegram_id, pairs in match_alert_users(jobs).items()
+        if telegram_id != exclude_telegram_id
+    }
+    if not routed:
+        return
+    
+    from .digest import DigestService
+    
+    # In digest mode matches wait in per-user buffers for the digest flusher
+    digest = DigestService()
+    if digest.enabled:
+        try:
+            from app import app
+            
+            with app.app_context():
+                digest.buffer(routed)
+        except Exception as e:
+            logger.error(f"Digest buffering error: {e}")
+        return
+    
+    scraper = JobScrapingService()
+    for telegram_id, pairs in routed.items():
+        alert_jobs = [job for job, _ in pairs]
+        search_terms = sorted({alert.search_term for _, alert in pairs})
+        result = {
+            'success': True,
+            'jobs': alert_jobs,
+            'count': len(alert_jobs),
+            'search_term': ', '.join(search_terms),
+            'location': None,
+            'source': 'alert'
+        }
+        notification_queue.put_nowait((telegram_id, scraper.format_jobs_summary(result)))
+
+async def send_notifications(bot: Bot):
+    """Send queued alert notifications one at a time at the global pace"""
+    while True:
+        telegram_id, text = await notification_queue.get()
+        try:
+            await send_with_retry(bot, telegram_id, text)
+        except Exception as e:
+            logger.error(f"Alert notification to {telegram_id} failed: {e}")
+        finally:
+            notification_queue.task_done()
+        await asyncio.sleep(notification_interval)
+
+async def flush_digests(bot: Bot):
+    """Periodically send due per-user digests, one message batch per user"""
+    from .digest import DigestService
+    from app import app
+    
+    digest = DigestService()
+    while True:
+        await asyncio.sleep(digest.flush_interval)
+        try:
+            with app.app_context():
+                pending = digest.pending_digests()
+        except Exception as e:
+            logger.error(f"Digest lookup error: {e}")
+            continue
+        await send_digests(bot, digest, pending)
+
+async def send_digests(bot: Bot, digest, pending: list[tuple[int, list[tuple[str, list[int]]]]]):
+    """Send rendered digests, acknowledging each message once it is delivered"""
+    from app import app
+    
+    for telegram_id, messages in pending:
+        try:
+            for text, entry_ids in messages:
+                await send_with_retry(bot, telegram_id, text)
+                # Entries are removed per sent message, so a failure part way
+                # resends only the rest and a restart never loses them
+                with app.app_context():
+                    digest.acknowledge(entry_ids)
+                await asyncio.sleep(notification_interval)
+        except (TelegramForbiddenError, TelegramBadRequest) as e:
+            # Permanent rejections would otherwise be retried on every flush;
+            # send_with_retry has already tried the message as plain text
+            chat_gone = isinstance(e, TelegramForbiddenError) or 'chat not found' in str(e).lower()
+            logger.error(f"Digest to {telegram_id} rejected: {e}")
+            try:
+                with app.app_context():
+                    if chat_gone:
+                        digest.deactivate(telegram_id)
+                    else:
+                        digest.acknowledge(entry_ids)
+            except Exception as e:
+                logger.error(f"Digest cleanup for {telegram_id} failed: {e}")
+        except Exception as e:
+            logger.error(f"Digest to {telegram_id} failed: {e}")
+
+async def refresh_search(message: Message, search_term: str, location: str):
+    """Scrape job boards in the background and send only newly found jobs"""
+    try:
+        from .job_scraping import JobScrapingService
+        
+        scraper = JobScrapingService()
+        user_id = message.from_user.id if message.from_user else 0
+        result = await scrape_scheduler.run(
+            user_id,
+            WorkClass.BACKGROUND,
+            lambda: scraper.search_jobs(search_term=search_term, location=location, only_new=True)
+        )
+        if not result.get('success'):
+            return
+        
+        new_jobs = ingest_jobs(result['jobs'])
+        if not new_jobs:
+            return
+        
+        notify_alert_matches(new_jobs, exclude_telegram_id=user_id)
+        
+        logger.info(f"Background refresh found {len(new_jobs)} new jobs for '{search_term}'")
+        new_result = {
+            'success': True,
+            'jobs': new_jobs,
+            'count': len(new_jobs),
+            'search_term': search_term,
+            'location': location,
+            'source': 'refresh'
+        }
+        await message.answer(scraper.format_jobs_summary(new_result), parse_mode="Markdown")
+    except QuotaExceeded:
+        logger.info(f"Skipping background refresh for '{search_term}', one is already pending")
+    except Exception as e:
+        logger.error(f"Background refresh error: {e}")
+
 @dp.message(Command("start"))
 async def start_handler(message: Message):
     """Handle /start command"""
@@ -104,19 +313,40 @@ async def process_location_and_search(message: Message, state: FSMContext):
     
     logger.info(f"User {message.from_user.id if message.from_user else 'Unknown'} searching for '{search_term}' in '{location}'")
     
+    # Answer instantly from recently scraped jobs when possible
+    local_result = search_local_jobs(search_term, location)
+    if local_result.get('success'):
+        from .job_scraping import JobScrapingService
+        
+        await message.answer(JobScrapingService().format_jobs_summary(local_result), parse_mode="Markdown")
+        if background_refresh_enabled:
+            task = asyncio.create_task(refresh_search(message, search_term, location))
+            background_tasks.add(task)
+            task.add_done_callback(background_tasks.discard)
+        return
+    
     # Import job scraping service and perform search
     try:
         from .job_scraping import JobScrapingService
         
         scraper = JobScrapingService()
+        user_id = message.from_user.id if message.from_user else 0
         
-        await message.answer(f"🔎 Searching for '{search_term}' jobs in '{location}'... Please wait.")
-          # Perform search with user input
-        result = await scraper.search_jobs(
-            search_term=search_term,
-            location=location
+        # Queue first so a user over quota is not told a search started
+        ticket = scrape_scheduler.submit(
+            user_id,
+            WorkClass.INTERACTIVE,
+            lambda: scraper.search_jobs(
+                search_term=search_term,
+                location=location
+            )
         )
         
+        await message.answer(f"🔎 Searching for '{search_term}' jobs in '{location}'... Please wait.")
+        if ticket.position:
+            await message.answer(f"⏳ You're #{ticket.position} in the queue, about {ticket.eta:.0f}s until your search starts.")
+        result = await ticket.future
+        
         # Log job details for debugging
         if result and 'jobs' in result:
             job_count = len(result['jobs'])
@@ -127,11 +357,22 @@ async def process_location_and_search(message: Message, state: FSMContext):
                 logger.info(f"Job {i}: ID={job_id}, Title='{title}'")
         else:
             logger.info("Search result: No jobs found or invalid result format")
+        
+        # Persist scraped jobs; storage failures must not break the search reply
+        if result.get('success'):
+            new_jobs = ingest_jobs(result['jobs'])
+        else:
+            new_jobs = []
             
         # Format and send results
         formatted_message = scraper.format_jobs_summary(result)
         await message.answer(formatted_message, parse_mode="Markdown")
         
+        # Other users' alerts are served from this scrape instead of their own
+        notify_alert_matches(new_jobs, exclude_telegram_id=user_id)
+        
+    except QuotaExceeded:
+        await message.answer("You already have searches in progress. Please wait for them to finish.")
     except ImportError:
         logger.warning("Job scraping service not available")
         await message.answer("Job search is temporarily unavailable. Please try again later.")
@@ -174,6 +415,24 @@ You can use /cancel anytime to stop the current search.
 async def start_bot():
     """Main entry point for the bot"""
     logger.info("Starting Telegram bot...")
+    try:
+        from .alert_matcher import alert_matcher
+        from models import Alert
+        from app import app
+        
+        with app.app_context():
+            alert_matcher.load(Alert.query.all())
+    except Exception as e:
+        logger.error(f"Alert index load failed: {e}")
+    
+    from .digest import DigestService
+    
+    # Digest mode and immediate alerts are exclusive, so one sender paces all proactive messages
+    sender = flush_digests if DigestService().enabled else send_notifications
+    task = asyncio.create_task(sender(bot))
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    
     try:
         await dp.start_polling(bot)
     except Exception as e:
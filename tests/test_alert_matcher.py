@@ -0,0 +1,77 @@
+"""
+Tests for the inverted-index alert matcher
+"""
+
+from types import SimpleNamespace
+from services.alert_matcher import AlertMatcher, tokenize, location_tokens
+
+def make_alert(alert_id, user_id, search_term, location=None):
+    return SimpleNamespace(id=alert_id, user_id=user_id, search_term=search_term, location=location)
+
+def make_matcher(*alerts):
+    matcher = AlertMatcher()
+    matcher.load(alerts)
+    return matcher
+
+def matched_ids(matcher, job):
+    return sorted(alert.id for alert in matcher.match(job))
+
+def test_tokenize_keeps_language_symbols():
+    assert tokenize('Senior C++ / C# Developer') == {'senior', 'c++', 'c#', 'developer'}
+    assert tokenize(None) == frozenset()
+
+def test_location_tokens_use_city_part():
+    assert location_tokens('New York, NY') == {'new', 'york'}
+    assert location_tokens(None) == frozenset()
+
+def test_all_alert_terms_must_be_in_title():
+    matcher = make_matcher(
+        make_alert(1, 10, 'python'),
+        make_alert(2, 11, 'python developer'),
+        make_alert(3, 12, 'senior python developer'),
+    )
+    assert matched_ids(matcher, {'title': 'Python Developer'}) == [1, 2]
+    assert matched_ids(matcher, {'title': 'Senior Python Developer'}) == [1, 2, 3]
+    assert matched_ids(matcher, {'title': 'Java Developer'}) == []
+
+def test_location_must_match_city_tokens():
+    matcher = make_matcher(make_alert(1, 10, 'python', 'New York, NY'))
+    assert matched_ids(matcher, {'title': 'Python Dev', 'location': 'New York, NY, US'}) == [1]
+    assert matched_ids(matcher, {'title': 'Python Dev', 'location': 'York, UK'}) == []
+    assert matched_ids(matcher, {'title': 'Python Dev'}) == []
+
+def test_alert_without_location_matches_anywhere():
+    matcher = make_matcher(make_alert(1, 10, 'python'))
+    assert matched_ids(matcher, {'title': 'Python Dev', 'location': 'London'}) == [1]
+
+def test_remote_alert_matches_remote_jobs_only():
+    matcher = make_matcher(make_alert(1, 10, 'devops', 'remote'))
+    assert matched_ids(matcher, {'title': 'DevOps Engineer', 'location': 'Remote'}) == [1]
+    assert matched_ids(matcher, {'title': 'DevOps Engineer', 'location': 'Austin, TX', 'is_remote': True}) == [1]
+    assert matched_ids(matcher, {'title': 'DevOps Engineer', 'location': 'Austin, TX'}) == []
+
+def test_remove_and_update_alert():
+    matcher = make_matcher(make_alert(1, 10, 'python'), make_alert(2, 11, 'python'))
+    matcher.remove(1)
+    assert matched_ids(matcher, {'title': 'Python Dev'}) == [2]
+
+    matcher.add(make_alert(2, 11, 'golang'))
+    assert matched_ids(matcher, {'title': 'Python Dev'}) == []
+    assert matched_ids(matcher, {'title': 'Golang Dev'}) == [2]
+
+def test_alert_without_terms_is_not_indexed():
+    matcher = make_matcher(make_alert(1, 10, '---'))
+    assert matched_ids(matcher, {'title': 'Anything'}) == []
+
+def test_match_jobs_routes_each_job_once_per_user():
+    matcher = make_matcher(
+        make_alert(1, 10, 'python'),
+        make_alert(2, 10, 'python developer'),
+        make_alert(3, 11, 'developer'),
+    )
+    python_job = {'title': 'Python Developer'}
+    java_job = {'title': 'Java Developer'}
+    routed = matcher.match_jobs([python_job, java_job])
+
+    assert [job for job, _ in routed[10]] == [python_job]
+    assert [job for job, _ in routed[11]] == [python_job, java_job]
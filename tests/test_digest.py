@@ -0,0 +1,153 @@
+"""
+Tests for per-user digest batching and delivery
+"""
+
+import os
+import sys
+import asyncio
+import types
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import pytest
+from flask import Flask
+
+# Telegram service refuses to import without a token; the fake bot never uses it
+os.environ.setdefault('TELEGRAM_BOT_TOKEN', '123456:TEST-TOKEN')
+
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+from aiogram.methods import SendMessage
+from models import db, DigestEntry, User
+from services import telegram
+from services.digest import DigestService
+
+@pytest.fixture
+def app(monkeypatch):
+    """In-memory app holding only the tables digests use"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.metadata.create_all(db.engine, tables=[User.__table__, DigestEntry.__table__])
+    # Telegram handlers open contexts through 'from app import app'
+    app_module = types.ModuleType('app')
+    app_module.app = app
+    monkeypatch.setitem(sys.modules, 'app', app_module)
+    monkeypatch.setattr(telegram, 'notification_interval', 0)
+    with app.app_context():
+        yield app
+
+@pytest.fixture
+def digest(monkeypatch):
+    monkeypatch.setenv('DIGEST_WINDOW_MINUTES', '60')
+    return DigestService()
+
+def add_user(telegram_id, is_active=True):
+    user = User(telegram_id=telegram_id, first_name=f"user{telegram_id}", is_active=is_active)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+def add_entries(user, count, minutes_ago=90, title='Python Developer'):
+    created_at = datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)
+    for i in range(count):
+        db.session.add(DigestEntry(
+            user_id=user.id, search_term='python', site='indeed', external_id=f"{user.id}-{minutes_ago}-{i}",
+            title=f"{title} {i}", company='Acme', job_url=f"https://example.com/{i}", created_at=created_at
+        ))
+    db.session.commit()
+
+def stored_entries(user):
+    return DigestEntry.query.filter_by(user_id=user.id).count()
+
+def reload(user):
+    # Delivery commits through its own app context and session
+    db.session.expire_all()
+    return db.session.get(User, user.id)
+
+class FakeBot:
+    """Records sends and rejects them like Telegram would"""
+
+    def __init__(self, blocked=(), strict_markdown=False, fail_after=None):
+        self.blocked = set(blocked)
+        self.strict_markdown = strict_markdown
+        self.fail_after = fail_after
+        self.sent = []
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        method = SendMessage(chat_id=chat_id, text=text)
+        if chat_id in self.blocked:
+            raise TelegramForbiddenError(method, 'Forbidden: bot was blocked by the user')
+        if self.strict_markdown and parse_mode and '_' in text:
+            raise TelegramBadRequest(method, "Bad Request: can't parse entities")
+        if self.fail_after is not None and len(self.sent) >= self.fail_after:
+            raise RuntimeError('connection reset')
+        self.sent.append((chat_id, text, parse_mode))
+
+def flush(bot, digest):
+    asyncio.run(telegram.send_digests(bot, digest, digest.pending_digests()))
+
+def test_render_splits_by_size_and_keeps_entry_ids(digest):
+    digest.max_message_length = 300
+    entries = [
+        SimpleNamespace(id=i, search_term='python', site='indeed', title=f"Python Developer {i}",
+                        company='Acme', location='Remote', job_url=f"https://example.com/{i}", date_posted=None)
+        for i in range(1, 6)
+    ]
+    messages = digest.render(entries)
+    assert len(messages) > 1
+    assert [entry_id for _, ids in messages for entry_id in ids] == [1, 2, 3, 4, 5]
+    assert all(len(text) <= 300 for text, _ in messages)
+    assert 'Job Alert Digest**\n' in messages[0][0]
+    assert '(continued)' in messages[1][0]
+
+def test_only_users_past_the_window_are_due(app, digest):
+    due, waiting = add_user(1), add_user(2)
+    add_entries(due, 2, minutes_ago=90)
+    add_entries(due, 1, minutes_ago=5)
+    add_entries(waiting, 2, minutes_ago=30)
+
+    pending = digest.pending_digests()
+    assert [telegram_id for telegram_id, _ in pending] == [1]
+    assert sum(len(ids) for _, ids in pending[0][1]) == 3
+
+def test_inactive_users_are_cleared_without_messages(app, digest):
+    inactive = add_user(1, is_active=False)
+    add_entries(inactive, 2)
+    assert digest.pending_digests() == []
+    assert stored_entries(inactive) == 0
+
+def test_sent_messages_are_acknowledged_one_by_one(app, digest):
+    digest.max_message_length = 300
+    user = add_user(1)
+    add_entries(user, 5)
+
+    first = FakeBot(fail_after=1)
+    flush(first, digest)
+    delivered = first.sent[0][1]
+    assert 0 < stored_entries(user) < 5
+
+    # The next flush only sends what was not delivered
+    second = FakeBot()
+    flush(second, digest)
+    resent = ''.join(text for _, text, _ in second.sent)
+    for i in range(5):
+        assert (f"Python Developer {i}**" in delivered) != (f"Python Developer {i}**" in resent)
+    assert stored_entries(user) == 0
+
+def test_blocked_user_is_deactivated_and_reactivated_on_start(app, digest):
+    user = add_user(1)
+    add_entries(user, 2)
+    flush(FakeBot(blocked={1}), digest)
+    assert not reload(user).is_active
+    assert stored_entries(user) == 0
+
+    User.find_or_create(SimpleNamespace(id=1, username=None, first_name='user1', last_name=None))
+    assert reload(user).is_active
+
+def test_markdown_rejection_falls_back_to_plain_text(app, digest):
+    user = add_user(1)
+    add_entries(user, 1, title='Senior_Python Developer')
+    bot = FakeBot(strict_markdown=True)
+    flush(bot, digest)
+    assert [parse_mode for _, _, parse_mode in bot.sent] == [None]
+    assert stored_entries(user) == 0
@@ -0,0 +1,77 @@
+"""
+Tests for normalizing scraped jobs before they are stored
+"""
+
+from datetime import date, datetime, timedelta, timezone
+import pandas as pd
+import pytest
+from services.job_ingestion import JobIngestionService
+
+TODAY = datetime.now(timezone.utc).date()
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv('JOBS_RETENTION_DAYS', '30')
+    return JobIngestionService()
+
+def make_job(job_id='in-1', site='indeed', **fields):
+    return {'id': job_id, 'site': site, 'title': 'Python Developer', 'job_url': f"https://example.com/{job_id}", **fields}
+
+@pytest.mark.parametrize('value, expected', [
+    (pd.Timestamp('2024-05-03 14:00'), date(2024, 5, 3)),
+    (datetime(2024, 5, 3, 23, 59), date(2024, 5, 3)),
+    (date(2024, 5, 3), date(2024, 5, 3)),
+    ('2024-05-03', date(2024, 5, 3)),
+    ('2024-05-03T08:00:00', date(2024, 5, 3)),
+    (pd.NaT, TODAY),
+    (None, TODAY),
+    (float('nan'), TODAY),
+    ('N/A', TODAY),
+])
+def test_date_posted_normalization(service, value, expected):
+    assert service._to_row(make_job(date_posted=value))['date_posted'] == expected
+
+def test_missing_values_become_none(service):
+    row = service._to_row(make_job(company=float('nan'), location=None, is_remote=pd.NA))
+    assert row['company'] is None
+    assert row['location'] is None
+    assert row['is_remote'] is None
+
+def test_external_id_falls_back_to_url(service):
+    row = service._to_row(make_job(job_id=float('nan'), job_url='https://example.com/apply'))
+    assert row['external_id'] == 'https://example.com/apply'
+
+def test_rows_without_site_or_identifier_are_skipped(service):
+    assert service._to_row(make_job(site=None)) is None
+    assert service._to_row({'site': 'indeed', 'id': None, 'job_url': None}) is None
+
+def test_unique_keeps_first_row_per_posting(service):
+    rows = [
+        {'site': 'indeed', 'external_id': '1', 'date_posted': TODAY},
+        {'site': 'indeed', 'external_id': '1', 'date_posted': TODAY - timedelta(days=1)},
+        {'site': 'linkedin', 'external_id': '1', 'date_posted': TODAY},
+    ]
+    assert service._unique(rows) == [rows[0], rows[2]]
+
+def test_ingest_filters_expired_and_duplicate_rows_before_storage(service, monkeypatch):
+    checked = []
+
+    def drop_stored(rows):
+        checked.extend(rows)
+        return []
+
+    monkeypatch.setattr(service, '_drop_stored', drop_stored)
+    jobs = [
+        make_job('fresh', date_posted=TODAY),
+        # Undated postings are dated today and deduplicated on (site, external_id)
+        make_job('fresh', date_posted=None),
+        make_job('undated', date_posted=pd.NaT),
+        make_job('expired', date_posted=TODAY - timedelta(days=31)),
+        make_job('edge', date_posted=TODAY - timedelta(days=30)),
+    ]
+    assert service.ingest(jobs) == []
+    assert [(row['external_id'], row['date_posted']) for row in checked] == [
+        ('fresh', TODAY),
+        ('undated', TODAY),
+        ('edge', TODAY - timedelta(days=30)),
+    ]
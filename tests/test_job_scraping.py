@@ -0,0 +1,124 @@
+"""
+Tests for incremental scraping windows and watermarks
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+import pytest
+from services import job_scraping
+from services.job_scraping import JobScrapingService
+from services.site_health import NegativeResultCache, SiteHealthRegistry
+
+class FakeWatermarks:
+    """In-memory ScrapeWatermarkStore"""
+
+    def __init__(self):
+        self.marks = {}
+        self.seen = set()
+
+    def get(self, query_key, site):
+        return self.marks.get((query_key, site))
+
+    def advance(self, query_key, site, scraped_at):
+        self.marks[(query_key, site)] = scraped_at
+
+    def seen_ids(self, site, external_ids):
+        return {external_id for external_id in external_ids if external_id in self.seen}
+
+class FakeJobSpy:
+    """Replacement for scrape_jobs returning a fixed number of postings"""
+
+    def __init__(self, count):
+        self.count = count
+        self.calls = []
+
+    def __call__(self, **kwargs):
+        self.calls.append(kwargs)
+        return pd.DataFrame([
+            {'id': f"in-{i}", 'site': 'indeed', 'title': 'Python Developer', 'job_url': f"https://example.com/{i}"}
+            for i in range(self.count)
+        ])
+
+@pytest.fixture
+def scraper(monkeypatch):
+    monkeypatch.setenv('SCRAPE_DEFAULT_HOURS_OLD', '24')
+    monkeypatch.setenv('SCRAPE_MAX_RESULTS', '60')
+    monkeypatch.setattr(job_scraping, 'site_health', SiteHealthRegistry())
+    monkeypatch.setattr(job_scraping, 'negative_cache', NegativeResultCache(ttl=0))
+    service = JobScrapingService()
+    service.watermarks = FakeWatermarks()
+    return service
+
+def use_jobspy(monkeypatch, count):
+    jobspy = FakeJobSpy(count)
+    monkeypatch.setattr(job_scraping, 'scrape_jobs', jobspy)
+    return jobspy
+
+def search(scraper, only_new):
+    return asyncio.run(scraper.search_jobs('python developer', 'remote', only_new=only_new))
+
+def mark(scraper, hours_ago):
+    scraped_at = datetime.now(timezone.utc) - timedelta(hours=hours_ago)
+    scraper.watermarks.advance('python developer|remote', 'indeed', scraped_at)
+    return scraped_at
+
+def test_complete_scrape_advances_watermark(scraper, monkeypatch):
+    jobspy = use_jobspy(monkeypatch, 10)
+    assert search(scraper, only_new=True)['count'] == 10
+    assert jobspy.calls[0]['hours_old'] == 24
+    assert scraper.watermarks.get('python developer|remote', 'indeed') is not None
+
+def test_truncated_scrape_keeps_watermark(scraper, monkeypatch):
+    use_jobspy(monkeypatch, 60)
+    scraped_at = mark(scraper, 5)
+    search(scraper, only_new=True)
+    assert scraper.watermarks.get('python developer|remote', 'indeed') == scraped_at
+
+def test_truncated_first_scrape_leaves_no_watermark(scraper, monkeypatch):
+    jobspy = use_jobspy(monkeypatch, 60)
+    search(scraper, only_new=True)
+    search(scraper, only_new=True)
+    assert [call['hours_old'] for call in jobspy.calls] == [24, 24]
+    assert scraper.watermarks.get('python developer|remote', 'indeed') is None
+
+def test_only_new_scrape_uses_delta_window(scraper, monkeypatch):
+    jobspy = use_jobspy(monkeypatch, 10)
+    mark(scraper, 0.2)
+    search(scraper, only_new=True)
+    assert jobspy.calls[0]['hours_old'] == 1
+
+def test_interactive_search_uses_full_window(scraper, monkeypatch):
+    jobspy = use_jobspy(monkeypatch, 10)
+    mark(scraper, 0.2)
+    search(scraper, only_new=False)
+    assert jobspy.calls[0]['hours_old'] == 24
+
+def test_interactive_search_covers_older_watermark(scraper, monkeypatch):
+    jobspy = use_jobspy(monkeypatch, 10)
+    mark(scraper, 39.5)
+    search(scraper, only_new=False)
+    assert jobspy.calls[0]['hours_old'] == 40
+
+def test_only_new_drops_stored_postings(scraper, monkeypatch):
+    use_jobspy(monkeypatch, 3)
+    scraper.watermarks.seen = {'in-0', 'in-2'}
+    assert [job['id'] for job in search(scraper, only_new=True)['jobs']] == ['in-1']
+    assert search(scraper, only_new=False)['count'] == 3
+
+def test_empty_delta_is_not_cached_for_interactive_search(scraper, monkeypatch):
+    monkeypatch.setattr(job_scraping, 'negative_cache', NegativeResultCache(ttl=300))
+    jobspy = use_jobspy(monkeypatch, 0)
+    mark(scraper, 0.2)
+    assert not search(scraper, only_new=True)['success']
+
+    jobspy.count = 5
+    assert search(scraper, only_new=False)['count'] == 5
+
+def test_concurrent_collectors_claim_each_error_once():
+    jobspy_logger = logging.getLogger('JobSpy:Indeed')
+    with job_scraping.capture_jobspy_errors('indeed') as first:
+        with job_scraping.capture_jobspy_errors('indeed') as second:
+            jobspy_logger.error('429 Too Many Requests')
+    assert len(first) + len(second) == 1
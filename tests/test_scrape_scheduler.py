@@ -0,0 +1,124 @@
+"""
+Tests for weighted fair scheduling of scrape work
+"""
+
+import asyncio
+import pytest
+from services.scrape_scheduler import ScrapeScheduler, WorkClass, QuotaExceeded
+
+@pytest.fixture
+def make_scheduler(monkeypatch):
+    def make(concurrency=1, reserved=0, quota=2, background_quota=1):
+        monkeypatch.setenv('SCRAPE_CONCURRENCY', str(concurrency))
+        monkeypatch.setenv('SCRAPE_RESERVED_INTERACTIVE', str(reserved))
+        monkeypatch.setenv('SCRAPE_USER_QUOTA', str(quota))
+        monkeypatch.setenv('SCRAPE_BACKGROUND_USER_QUOTA', str(background_quota))
+        return ScrapeScheduler()
+    return make
+
+def recorder(order, name, delay=0.01):
+    async def scrape():
+        order.append(name)
+        await asyncio.sleep(delay)
+        return name
+    return scrape
+
+def test_interactive_overtakes_queued_background(make_scheduler):
+    async def scenario():
+        scheduler = make_scheduler()
+        order = []
+        tickets = [
+            scheduler.submit(user_id, WorkClass.BACKGROUND, recorder(order, f"bg{user_id}"))
+            for user_id in (1, 2, 3)
+        ]
+        interactive = scheduler.submit(9, WorkClass.INTERACTIVE, recorder(order, 'interactive'))
+        await asyncio.gather(*(ticket.future for ticket in tickets), interactive.future)
+        return order, interactive.position
+
+    order, position = asyncio.run(scenario())
+    assert order == ['bg1', 'interactive', 'bg2', 'bg3']
+    assert position == 1
+
+def test_busy_user_only_delays_themselves(make_scheduler):
+    async def scenario():
+        scheduler = make_scheduler(quota=3)
+        order = []
+        tickets = [
+            scheduler.submit(1, WorkClass.INTERACTIVE, recorder(order, f"a{i}"))
+            for i in range(3)
+        ]
+        tickets.append(scheduler.submit(2, WorkClass.INTERACTIVE, recorder(order, 'b')))
+        await asyncio.gather(*(ticket.future for ticket in tickets))
+        return order
+
+    assert asyncio.run(scenario()) == ['a0', 'b', 'a1', 'a2']
+
+def test_reserved_worker_keeps_interactive_unblocked(make_scheduler):
+    async def scenario():
+        scheduler = make_scheduler(concurrency=2, reserved=1)
+        order = []
+        background = [
+            scheduler.submit(user_id, WorkClass.BACKGROUND, recorder(order, f"bg{user_id}"))
+            for user_id in (1, 2)
+        ]
+        stats = scheduler.stats()
+        interactive = scheduler.submit(9, WorkClass.INTERACTIVE, recorder(order, 'interactive'))
+        await asyncio.gather(*(ticket.future for ticket in background), interactive.future)
+        return stats, interactive.position
+
+    stats, position = asyncio.run(scenario())
+    assert stats['background'] == {'queued': 1, 'running': 1}
+    assert position == 0
+
+def test_quota_is_per_work_class_and_released(make_scheduler):
+    async def scenario():
+        scheduler = make_scheduler(quota=1, background_quota=1)
+        order = []
+        first = scheduler.submit(1, WorkClass.INTERACTIVE, recorder(order, 'first'))
+        with pytest.raises(QuotaExceeded):
+            scheduler.submit(1, WorkClass.INTERACTIVE, recorder(order, 'rejected'))
+
+        # Background work has its own quota
+        refresh = scheduler.submit(1, WorkClass.BACKGROUND, recorder(order, 'refresh'))
+        await asyncio.gather(first.future, refresh.future)
+
+        second = scheduler.submit(1, WorkClass.INTERACTIVE, recorder(order, 'second'))
+        await second.future
+        return order
+
+    assert asyncio.run(scenario()) == ['first', 'refresh', 'second']
+
+def test_failed_scrape_propagates_exception(make_scheduler):
+    async def scenario():
+        scheduler = make_scheduler()
+
+        async def failing():
+            raise RuntimeError('blocked')
+
+        with pytest.raises(RuntimeError, match='blocked'):
+            await scheduler.run(1, WorkClass.INTERACTIVE, failing)
+        # The slot is released after the failure
+        return await scheduler.run(1, WorkClass.INTERACTIVE, recorder([], 'ok'))
+
+    assert asyncio.run(scenario()) == 'ok'
+
+def test_cancelled_scrape_resolves_future(make_scheduler):
+    async def scenario():
+        scheduler = make_scheduler()
+
+        async def hanging():
+            await asyncio.sleep(60)
+
+        ticket = scheduler.submit(1, WorkClass.INTERACTIVE, hanging)
+        await asyncio.sleep(0)
+        for task in list(scheduler._tasks):
+            task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(ticket.future, 1)
+        return scheduler.stats()
+
+    assert asyncio.run(scenario())['interactive'] == {'queued': 0, 'running': 0}
+
+def test_reserved_workers_leave_one_for_background(make_scheduler):
+    assert make_scheduler(concurrency=2, reserved=5).background_limit == 1
+    assert make_scheduler(concurrency=4, reserved=1).background_limit == 3
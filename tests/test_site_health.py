@@ -0,0 +1,125 @@
+"""
+Tests for per-site circuit breakers and negative-result caching
+"""
+
+import pytest
+from services import site_health
+from services.site_health import CircuitBreaker, CircuitState, NegativeResultCache
+
+class FakeClock:
+    """Controllable replacement for time.monotonic"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(site_health.time, 'monotonic', clock)
+    # Take the full backoff so timings are deterministic
+    monkeypatch.setattr(site_health.random, 'uniform', lambda low, high: high)
+    return clock
+
+def make_breaker():
+    return CircuitBreaker('indeed', failure_threshold=2, base_backoff=60, max_backoff=300)
+
+def test_opens_after_threshold(clock):
+    breaker = make_breaker()
+    breaker.record_failure('429')
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.allow_request()
+
+    breaker.record_failure('429')
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+    assert breaker.retry_in() == 60
+
+def test_half_open_allows_single_probe_then_closes(clock):
+    breaker = make_breaker()
+    breaker.record_failure('429')
+    breaker.record_failure('429')
+
+    clock.now += 61
+    assert breaker.allow_request() == CircuitState.HALF_OPEN
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert not breaker.allow_request()
+
+    breaker.record_success(probe=True)
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.consecutive_failures == 0
+    assert breaker.allow_request() == CircuitState.CLOSED
+
+def test_failed_probe_reopens_with_doubled_backoff(clock):
+    breaker = make_breaker()
+    breaker.record_failure('429')
+    breaker.record_failure('429')
+
+    clock.now += 61
+    assert breaker.allow_request()
+    breaker.record_failure('429', probe=True)
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.retry_in() == 120
+
+def test_backoff_is_capped(clock):
+    breaker = make_breaker()
+    breaker.record_failure('429')
+    breaker.record_failure('429')
+    for _ in range(5):
+        clock.now += breaker.retry_in() + 1
+        assert breaker.allow_request()
+        breaker.record_failure('429', probe=True)
+    assert breaker.retry_in() == 300
+
+def test_failures_while_open_do_not_extend_backoff(clock):
+    breaker = make_breaker()
+    breaker.record_failure('429')
+    breaker.record_failure('429')
+
+    # Requests that were in flight when the breaker opened
+    breaker.record_failure('429')
+    breaker.record_failure('429')
+    assert breaker.trips == 1
+    assert breaker.retry_in() == 60
+
+def test_released_probe_lets_next_request_probe(clock):
+    breaker = make_breaker()
+    breaker.record_failure('429')
+    breaker.record_failure('429')
+
+    clock.now += 61
+    assert breaker.allow_request()
+    breaker.release_probe()
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow_request()
+
+def test_stale_outcomes_do_not_decide_half_open(clock):
+    breaker = make_breaker()
+    # Admitted while closed, finishes after the breaker went half-open
+    assert breaker.allow_request() == CircuitState.CLOSED
+    breaker.record_failure('429')
+    breaker.record_failure('429')
+    clock.now += 61
+    assert breaker.allow_request() == CircuitState.HALF_OPEN
+
+    breaker.record_success()
+    breaker.record_failure('timeout')
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.probe_in_flight
+    assert not breaker.allow_request()
+
+def test_negative_cache_expires(clock):
+    cache = NegativeResultCache(ttl=300)
+    cache.put('python|remote', 'indeed', 'empty')
+    assert cache.get('python|remote', 'indeed') == 'empty'
+    assert cache.get('python|remote', 'linkedin') is None
+
+    clock.now += 301
+    assert cache.get('python|remote', 'indeed') is None
+
+def test_negative_cache_disabled_with_zero_ttl(clock):
+    cache = NegativeResultCache(ttl=0)
+    cache.put('python|remote', 'indeed', 'empty')
+    assert cache.get('python|remote', 'indeed') is None